@@ -0,0 +1,128 @@
+"""JWT-аутентификация по данным пользователя из токена."""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .cache import token_version, token_versions
+
+# Поля пользователя, которых достаточно для проверки прав и авторства.
+# Кроме id, они передаются в токене; версия данных - в claim ver.
+USER_FIELDS = (
+    'id', 'username', 'role', 'is_staff', 'is_superuser', 'is_active'
+)
+VERSION_CLAIM = 'ver'
+
+
+def make_user(values):
+    """
+    Пользователь только с полями USER_FIELDS.
+    Остальные поля отложены, как после only(), и догружаются из базы
+    при обращении; для FK и проверки прав они не нужны.
+    """
+    model = get_user_model()
+    data = dict(zip(USER_FIELDS, values))
+    names = [
+        field.attname for field in model._meta.concrete_fields
+        if field.attname in data
+    ]
+    return model.from_db(
+        DEFAULT_DB_ALIAS, names, [data[name] for name in names]
+    )
+
+
+def get_access_token(user):
+    """Токен доступа с данными пользователя и текущей версией."""
+    token = AccessToken.for_user(user)
+    for field in USER_FIELDS[1:]:
+        token[field] = getattr(user, field)
+    token[VERSION_CLAIM], = token_versions.get(token_version(user.pk))
+    return token
+
+
+class UserCache:
+    """
+    Ограниченный кеш полей USER_FIELDS по id с временем жизни.
+    Запись действительна, пока не изменилась версия токенов
+    пользователя и не истёк USER_CACHE_TTL.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.data = OrderedDict()
+
+    def get(self, user_id, version):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.data.get(user_id)
+            if entry is not None and entry[0] == version and entry[1] > now:
+                self.data.move_to_end(user_id)
+                return entry[2]
+        values = get_user_model().objects.filter(
+            pk=user_id
+        ).values_list(*USER_FIELDS).first()
+        if values is None:
+            return None
+        with self.lock:
+            self.data[user_id] = (version, now + self.ttl, values)
+            self.data.move_to_end(user_id)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+        return values
+
+
+user_cache = UserCache(
+    getattr(settings, 'USER_CACHE_SIZE', 10000),
+    getattr(settings, 'USER_CACHE_TTL', 60)
+)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Пользователь собирается из данных токена без запроса к базе.
+    Если токен выдан до изменения пользователя (версия в кеше
+    изменилась) или данных в нём нет, поля берутся из user_cache.
+    Версии хранятся в кеше VERSIONS_CACHE, общем для всех
+    процессов: иначе смена роли в одном процессе не отзовёт токены
+    в другом (это проверяет api.E001).
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+        version, = token_versions.get(token_version(user_id))
+        if validated_token.get(VERSION_CLAIM) == version and all(
+            field in validated_token for field in USER_FIELDS[1:]
+        ):
+            values = (user_id, *(
+                validated_token[field] for field in USER_FIELDS[1:]
+            ))
+        else:
+            values = user_cache.get(user_id, version)
+            if values is None:
+                raise AuthenticationFailed(
+                    _('User not found'), code='user_not_found'
+                )
+        user = make_user(values)
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive'
+            )
+        return user
@@ -0,0 +1,169 @@
+"""Версии данных, версионируемый кеш ответов и условные GET-запросы."""
+import hashlib
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.response import Response
+
+NS_IN_SECOND = 10 ** 9
+
+
+class CacheVersions:
+    """
+    Счётчики версий данных в общем для процессов кеше VERSIONS_CACHE.
+    Версия - время последнего изменения в наносекундах, поэтому
+    после вытеснения ключа она не повторяется и годится
+    для заголовка Last-Modified. Общая эпоха не меньше любой версии:
+    bump_all() устаревает все данные одной записью.
+    """
+
+    EPOCH = '*'
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, 'VERSIONS_CACHE', 'default')]
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'VERSIONS_TIMEOUT', None)
+
+    def key(self, name):
+        return f'{self.prefix}:{name}'
+
+    def get(self, *names):
+        """Возвращает текущие версии, создавая недостающие."""
+        keys = [self.key(name) for name in names]
+        epoch_key = self.key(self.EPOCH)
+        versions = self.cache.get_many([*keys, epoch_key])
+        for key in (*keys, epoch_key):
+            if key not in versions:
+                # Эпоху читает каждый запрос, и её истечение сбрасывало
+                # бы все данные разом, поэтому она хранится бессрочно.
+                timeout = None if key == epoch_key else self.timeout
+                versions[key] = time.time_ns()
+                if not self.cache.add(key, versions[key], timeout):
+                    versions[key] = self.cache.get(key, versions[key])
+        epoch = versions[epoch_key]
+        return [max(versions[key], epoch) for key in keys]
+
+    def bump(self, *names):
+        """Обновляет версии, делая зависящие от них данные устаревшими."""
+        now = time.time_ns()
+        self.cache.set_many(
+            {self.key(name): now for name in names}, self.timeout
+        )
+
+    def bump_all(self):
+        """Делает устаревшими все данные с версиями этого префикса."""
+        self.cache.set(self.key(self.EPOCH), time.time_ns(), None)
+
+
+def get_request_digest(request, versions):
+    """Хеш параметров запроса, влияющих на тело ответа, и версий."""
+    params = sorted(request.query_params.lists())
+    raw = repr((
+        request.get_host(),
+        request.path,
+        request.META.get('HTTP_ACCEPT'),
+        params,
+        versions,
+    ))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+class VersionedResponseCache:
+    """
+    Кеширует данные ответов по ключу из параметров запроса и версий.
+    При изменении данных версия меняется, и старые записи
+    просто перестают читаться.
+    """
+
+    def __init__(self, prefix, alias='default', timeout=None):
+        self.prefix = prefix
+        self.alias = alias
+        self.timeout = timeout
+        self.stats = Counter()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get_timeout(self):
+        if self.timeout is not None:
+            return self.timeout
+        return getattr(settings, 'RESPONSE_CACHE_TIMEOUT', None)
+
+    def fetch(self, request, versions, render):
+        """
+        Возвращает ответ из кеша или вызывает render() и
+        сохраняет успешный результат.
+        """
+        key = f'{self.prefix}:{get_request_digest(request, versions)}'
+        data = self.cache.get(key)
+        if data is not None:
+            self.stats['hits'] += 1
+            return Response(data, headers={'X-Cache': 'HIT'})
+        self.stats['misses'] += 1
+        response = render()
+        if response.status_code == status.HTTP_200_OK:
+            self.cache.set(key, response.data, self.get_timeout())
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+def conditional_response(request, versions, render):
+    """
+    Отвечает 304 Not Modified по If-None-Match/If-Modified-Since,
+    не вызывая render(). Валидаторы строятся только из версий.
+    """
+    etag = quote_etag(get_request_digest(request, versions))
+    last_modified = max(versions) // NS_IN_SECOND
+    # Last-Modified точен до секунды: пока секунда последнего изменения
+    # не прошла, в ней возможно ещё одно, и If-Modified-Since его
+    # бы не заметил. До этого момента проверяется только ETag.
+    if last_modified >= time.time_ns() // NS_IN_SECOND:
+        last_modified = None
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        response = render()
+        if response.status_code != status.HTTP_200_OK:
+            return response
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+LIST_VERSION = 'titles'
+CATALOG_VERSION = 'catalog'
+
+
+def title_version(title_id):
+    return f'title:{title_id}'
+
+
+def reviews_version(title_id):
+    return f'reviews:{title_id}'
+
+
+def comments_version(review_id):
+    return f'comments:{review_id}'
+
+
+def token_version(user_id):
+    return f'token:{user_id}'
+
+
+data_versions = CacheVersions('versions')
+token_versions = CacheVersions('tokens')
+title_cache = VersionedResponseCache('titles')
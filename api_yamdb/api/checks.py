@@ -0,0 +1,32 @@
+"""Системные проверки настроек API."""
+from django.conf import settings
+from django.core.checks import Error, register
+
+# Кеши, данные которых видны только своему процессу.
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+
+@register()
+def check_versions_cache(app_configs, **kwargs):
+    """
+    Версии в кеше одного процесса не сбрасывают кеш ответов и ETag
+    и не отзывают права из токенов, выданных до смены роли или удаления
+    пользователя, в других процессах.
+    """
+    alias = getattr(settings, 'VERSIONS_CACHE', 'default')
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if backend is None:
+        return [Error(
+            f'Кеш {alias!r} из VERSIONS_CACHE не описан в CACHES.',
+            id='api.E002',
+        )]
+    if backend in PROCESS_LOCAL_CACHES:
+        return [Error(
+            f'Кеш версий данных и токенов {alias!r} не общий для процессов.',
+            hint='Укажите в VERSIONS_CACHE кеш, общий для всех процессов: '
+                 'файловый, базу данных, Redis или Memcached.',
+            id='api.E001',
+        )]
+    return []
@@ -0,0 +1,74 @@
+"""Коды подтверждения: выдача, проверка и хранение только хеша."""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from django.utils.crypto import (
+    constant_time_compare,
+    get_random_string,
+    salted_hmac
+)
+
+from .constants import CONFIRMATION_CODE_LENGTH
+from reviews.models import ConfirmationCode
+
+
+def make_code_hash(code):
+    """HMAC кода на SECRET_KEY: без ключа хеш бесполезен для перебора."""
+    return salted_hmac(
+        'api.confirmation', code, algorithm='sha256'
+    ).hexdigest()
+
+
+def issue_confirmation_code(user):
+    """Выдаёт новый код пользователю, предыдущий перестаёт действовать."""
+    code = get_random_string(CONFIRMATION_CODE_LENGTH)
+    ConfirmationCode.objects.update_or_create(
+        user=user,
+        defaults={
+            'code_hash': make_code_hash(code),
+            'expires_at': timezone.now() + timedelta(
+                seconds=settings.CONFIRMATION_CODE_TTL
+            ),
+            'attempts': 0,
+        }
+    )
+    return code
+
+
+def check_confirmation_code(user, code):
+    """
+    Проверяет код пользователя, загруженного вместе с
+    select_related('confirmation_code'), одним запросом на запись:
+    верный код гасится (он одноразовый), неверный увеличивает
+    счётчик попыток.
+    """
+    try:
+        stored = user.confirmation_code
+    except ConfirmationCode.DoesNotExist:
+        return False
+    now = timezone.now()
+    max_attempts = settings.CONFIRMATION_CODE_MAX_ATTEMPTS
+    if stored.expires_at <= now or stored.attempts >= max_attempts:
+        return False
+    # Условия в UPDATE проверяются базой, а не по загруженной строке:
+    # параллельные попытки не превысят лимит, а код не сработает дважды.
+    codes = ConfirmationCode.objects.filter(
+        pk=stored.pk, expires_at__gt=now, attempts__lt=max_attempts
+    )
+    if not constant_time_compare(stored.code_hash, make_code_hash(code)):
+        codes.update(attempts=F('attempts') + 1)
+        return False
+    # Использованный код истекает сразу (удалит purge_confirmation_codes).
+    return bool(codes.filter(
+        code_hash=stored.code_hash
+    ).update(expires_at=now))
+
+
+def purge_confirmation_codes():
+    """Удаляет просроченные коды одним запросом."""
+    deleted, _ = ConfirmationCode.objects.filter(
+        expires_at__lte=timezone.now()
+    ).delete()
+    return deleted
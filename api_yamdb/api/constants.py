@@ -1 +1,8 @@
 MAX_LENGTH_EMAIL = 254
+TOP_TITLES_LIMIT = 50
+COMMENTS_PREVIEW_LIMIT = 3
+COMMENTS_PREVIEW_MAX_LIMIT = 20
+EXPORT_CHUNK_SIZE = 2000
+REVIEW_BATCH_MAX_SIZE = 500
+REVIEW_BATCH_ATTEMPTS = 3
+CONFIRMATION_CODE_LENGTH = 12
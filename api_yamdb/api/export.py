@@ -0,0 +1,95 @@
+"""Потоковая выгрузка данных в формате NDJSON."""
+import zlib
+from itertools import groupby
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .constants import EXPORT_CHUNK_SIZE
+from reviews.models import Comment, GenreTitle, Review, Title
+
+# Сколько байт строк копится перед отправкой очередного куска.
+BUFFER_SIZE = 64 * 1024
+
+encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+
+def iter_titles(chunk_size):
+    """
+    Произведения со слагами жанров.
+    Связи с жанрами читаются вторым курсором в том же порядке id,
+    поэтому жанры приклеиваются к строкам без запроса на каждую.
+    """
+    titles = Title.objects.order_by('id').values(
+        'id', 'name', 'year', 'description', 'rating', 'review_count',
+        'category__slug'
+    ).iterator(chunk_size=chunk_size)
+    links = groupby(
+        GenreTitle.objects.order_by('title_id', 'genre__slug').values_list(
+            'title_id', 'genre__slug'
+        ).iterator(chunk_size=chunk_size),
+        key=lambda link: link[0]
+    )
+    title_id, genres = next(links, (None, ()))
+    for row in titles:
+        while title_id is not None and title_id < row['id']:
+            title_id, genres = next(links, (None, ()))
+        row['genre'] = (
+            [slug for _, slug in genres] if title_id == row['id'] else []
+        )
+        row['category'] = row.pop('category__slug')
+        yield row
+
+
+def iter_reviews(chunk_size):
+    for row in Review.objects.order_by('id').values(
+        'id', 'title_id', 'author__username', 'text', 'score', 'pub_date',
+        'comment_count'
+    ).iterator(chunk_size=chunk_size):
+        row['author'] = row.pop('author__username')
+        yield row
+
+
+def iter_comments(chunk_size):
+    for row in Comment.objects.order_by('id').values(
+        'id', 'review__title_id', 'review_id', 'author__username', 'text',
+        'pub_date'
+    ).iterator(chunk_size=chunk_size):
+        row['title_id'] = row.pop('review__title_id')
+        row['author'] = row.pop('author__username')
+        yield row
+
+
+EXPORTS = {
+    'titles': iter_titles,
+    'reviews': iter_reviews,
+    'comments': iter_comments,
+}
+
+
+def iter_ndjson(name, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Строки выгрузки name в кодировке UTF-8, собранные в куски
+    около BUFFER_SIZE байт. В памяти не больше chunk_size строк.
+    """
+    buffer = []
+    size = 0
+    for row in EXPORTS[name](chunk_size):
+        line = (encoder.encode(row) + '\n').encode()
+        buffer.append(line)
+        size += len(line)
+        if size >= BUFFER_SIZE:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def iter_gzip(chunks):
+    """Сжимает поток кусков в формат gzip."""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
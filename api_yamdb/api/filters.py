@@ -1,20 +1,84 @@
 """Фильтры для произведений."""
 import django_filters
+from django.db.models import Count
 
-from reviews.models import Title
+from reviews.models import Genre, GenreTitle, Title
+from reviews.search import filter_titles_by_name, search_titles
+
+
+class CharInFilter(django_filters.BaseInFilter, django_filters.CharFilter):
+    """Фильтр по списку значений через запятую."""
 
 
 class TitleFilter(django_filters.FilterSet):
     """Фильтр произведений по жанрам, категориям и другим полям."""
-    genre = django_filters.CharFilter(
-        field_name='genre__slug', lookup_expr='icontains'
-    )
-    category = django_filters.CharFilter(
-        field_name='category__slug', lookup_expr='icontains'
+
+    GENRE_MODE_ANY = 'any'
+    GENRE_MODE_ALL = 'all'
+
+    genre = CharInFilter(method='filter_genre')
+    genre_mode = django_filters.ChoiceFilter(
+        choices=((GENRE_MODE_ANY, 'any'), (GENRE_MODE_ALL, 'all')),
+        method='filter_genre_mode'
     )
-    name = django_filters.CharFilter(lookup_expr='icontains')
+    category = CharInFilter(field_name='category__slug', lookup_expr='in')
+    name = django_filters.CharFilter(method='filter_name')
+    search = django_filters.CharFilter(method='filter_search')
 
     class Meta:
         """Мета-класс для фильтра."""
         model = Title
-        fields = ('genre', 'category', 'name', 'year')
+        fields = ('genre', 'category', 'name', 'year', 'search')
+
+    def filter_genre(self, queryset, name, value):
+        """
+        Точный фильтр по слагам жанров. По умолчанию подходит любой
+        из жанров, при genre_mode=all - только все сразу.
+        Слаги переводятся в id одним запросом, дальше работает
+        индекс (genre_id, title_id) таблицы связей.
+        """
+        slugs = frozenset(value)
+        genre_ids = self.get_genre_ids(slugs)
+        mode = self.form.cleaned_data.get('genre_mode')
+        if not genre_ids or (
+            mode == self.GENRE_MODE_ALL and len(genre_ids) < len(slugs)
+        ):
+            return queryset.none()
+        links = GenreTitle.objects.filter(
+            genre_id__in=genre_ids
+        ).order_by().values('title_id')
+        if mode == self.GENRE_MODE_ALL and len(genre_ids) > 1:
+            links = links.annotate(
+                genres_count=Count('genre_id')
+            ).filter(genres_count=len(genre_ids)).values('title_id')
+        return queryset.filter(pk__in=links)
+
+    def get_genre_ids(self, slugs):
+        """
+        id жанров по слагам. Страница и подсчёт количества фильтруются
+        отдельно, поэтому id запоминаются на время запроса.
+        """
+        memo = getattr(self.request, '_genre_ids', None)
+        if memo is None:
+            memo = {}
+            if self.request is not None:
+                self.request._genre_ids = memo
+        if slugs not in memo:
+            memo[slugs] = list(
+                Genre.objects.filter(slug__in=slugs).order_by().values_list(
+                    'id', flat=True
+                )
+            )
+        return memo[slugs]
+
+    def filter_genre_mode(self, queryset, name, value):
+        """Режим учитывается в filter_genre."""
+        return queryset
+
+    def filter_name(self, queryset, name, value):
+        """Поиск подстроки в названии через полнотекстовый индекс."""
+        return filter_titles_by_name(queryset, value)
+
+    def filter_search(self, queryset, name, value):
+        """Поиск по названию и описанию с сортировкой по релевантности."""
+        return search_titles(queryset, value)
@@ -0,0 +1,44 @@
+import gzip
+import os
+
+from django.core.management.base import BaseCommand
+
+from api.constants import EXPORT_CHUNK_SIZE
+from api.export import EXPORTS, iter_ndjson
+
+
+class Command(BaseCommand):
+    """Команда для выгрузки данных в файлы NDJSON."""
+    help = 'Выгрузка произведений, отзывов и комментариев в NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'names', nargs='*', choices=tuple(EXPORTS),
+            help='Что выгрузить (по умолчанию всё).'
+        )
+        parser.add_argument(
+            '--output-dir', default='.',
+            help='Папка для файлов.'
+        )
+        parser.add_argument(
+            '--gzip', action='store_true',
+            help='Сжимать файлы в gzip.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=EXPORT_CHUNK_SIZE,
+            help='Сколько строк читать из базы за раз.'
+        )
+
+    def handle(self, *args, **options):
+        os.makedirs(options['output_dir'], exist_ok=True)
+        for name in options['names'] or EXPORTS:
+            path = os.path.join(options['output_dir'], f'{name}.ndjson')
+            if options['gzip']:
+                path += '.gz'
+                file = gzip.open(path, 'wb')
+            else:
+                file = open(path, 'wb')
+            with file:
+                for chunk in iter_ndjson(name, options['chunk_size']):
+                    file.write(chunk)
+            self.stdout.write(self.style.SUCCESS(f'Выгружено: {path}'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.confirmation import purge_confirmation_codes
+
+
+class Command(BaseCommand):
+    """Команда для удаления просроченных кодов подтверждения."""
+    help = 'Удаление просроченных кодов подтверждения'
+
+    def handle(self, *args, **kwargs):
+        deleted = purge_confirmation_codes()
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено просроченных кодов: {deleted}'
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.cache import data_versions
+from reviews.models import Review, Title
+
+
+class Command(BaseCommand):
+    """Команда для пересчёта денормализованных счётчиков."""
+    help = 'Пересчёт рейтинга, количества отзывов и комментариев'
+
+    def handle(self, *args, **kwargs):
+        with transaction.atomic():
+            titles = Title.objects.all().recalculate_rating()
+            reviews = Review.objects.all().recalculate_comment_count()
+        data_versions.bump_all()
+        self.stdout.write(self.style.SUCCESS(
+            f'Счётчики пересчитаны: произведений {titles}, '
+            f'отзывов {reviews}'
+        ))
@@ -0,0 +1,47 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from api.outbox import get_queue_depth, send_batch, stats
+
+
+class Command(BaseCommand):
+    """Обработчик очереди писем."""
+    help = 'Отправка писем из очереди'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Сколько писем отправлять за раз.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Разобрать очередь и завершиться.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Писем в очереди: {get_queue_depth()}')
+        try:
+            with get_connection() as connection:
+                while True:
+                    if send_batch(options['batch_size'], connection):
+                        continue
+                    if options['once']:
+                        break
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        average = (
+            stats['send_seconds'] / stats['attempted']
+            if stats['attempted'] else 0
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Отправлено: {stats["sent"]}, ошибок: {stats["failed"]}, '
+            f'среднее время отправки: {average * 1000:.1f} мс, '
+            f'в очереди: {get_queue_depth()}'
+        ))
@@ -0,0 +1,168 @@
+"""Очередь писем: постановка в запросе, отправка отдельным процессом."""
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from reviews.models import OutgoingEmail
+
+# Счётчики процесса: attempted и send_seconds (попытки отправки и их
+# суммарное время), sent, failed (попытки с ошибкой), dropped
+# (исчерпаны все попытки).
+stats = Counter()
+
+
+def enqueue_email(dedupe_key, recipient, subject, body):
+    """
+    Ставит письмо в очередь и сразу возвращает управление.
+    Неотправленное письмо с тем же ключом заменяется новым.
+    При EMAIL_OUTBOX_EAGER письмо отправляется после коммита.
+    """
+    email, _ = OutgoingEmail.objects.update_or_create(
+        dedupe_key=dedupe_key,
+        defaults={
+            'recipient': recipient,
+            'subject': subject,
+            'body': body,
+            'status': OutgoingEmail.Status.PENDING,
+            'attempts': 0,
+            'next_attempt_at': timezone.now(),
+            'last_error': '',
+        }
+    )
+    if getattr(settings, 'EMAIL_OUTBOX_EAGER', False):
+        transaction.on_commit(
+            lambda: send_emails(OutgoingEmail.objects.filter(pk=email.pk))
+        )
+    return email
+
+
+def get_queue_depth():
+    """Количество писем, ожидающих отправки."""
+    return OutgoingEmail.objects.filter(
+        status=OutgoingEmail.Status.PENDING
+    ).count()
+
+
+def get_retry_delay(attempts):
+    """Экспоненциальная задержка перед следующей попыткой."""
+    return timedelta(
+        seconds=settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def claim_emails(queryset):
+    """
+    Забирает письма из queryset, которым пришло время, короткой
+    транзакцией: next_attempt_at сдвигается на EMAIL_OUTBOX_LEASE, и
+    другие обработчики их не видят. Если обработчик упадёт, письма
+    вернутся в очередь по истечении этого срока.
+    """
+    now = timezone.now()
+    lease = now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE)
+    with transaction.atomic():
+        emails = list(queryset.select_for_update(skip_locked=True).filter(
+            status=OutgoingEmail.Status.PENDING,
+            next_attempt_at__lte=now
+        ).order_by('next_attempt_at', 'id'))
+        OutgoingEmail.objects.filter(
+            pk__in=[email.pk for email in emails]
+        ).update(next_attempt_at=lease)
+    for email in emails:
+        email.next_attempt_at = lease
+    return emails, lease
+
+
+def send_emails(queryset, connection=None):
+    """
+    Отправляет письма из queryset, которым пришло время, через одно
+    соединение (переданное или новое). Возвращает число отправленных.
+    Отправка идёт вне транзакции, чтобы медленный SMTP не держал
+    блокировку базы; результаты записываются второй короткой
+    транзакцией и только для писем, срок захвата которых не истёк.
+    """
+    emails, lease = claim_emails(queryset)
+    if not emails:
+        return 0
+    if connection is None:
+        with get_connection() as connection:
+            sent, failed = deliver(emails, connection)
+    else:
+        sent, failed = deliver(emails, connection)
+    with transaction.atomic():
+        OutgoingEmail.objects.filter(
+            pk__in=[email.pk for email in sent], next_attempt_at=lease
+        ).update(
+            status=OutgoingEmail.Status.SENT,
+            sent_at=timezone.now(),
+            last_error=''
+        )
+        for email, error in failed:
+            retry(email, error)
+    stats['sent'] += len(sent)
+    return len(sent)
+
+
+def deliver(emails, connection):
+    """
+    Отправляет письма по одному.
+    Возвращает отправленные письма и пары (письмо, ошибка).
+    """
+    sent = []
+    failed = []
+    for email in emails:
+        started = time.monotonic()
+        try:
+            connection.send_messages([EmailMessage(
+                subject=email.subject,
+                body=email.body,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[email.recipient],
+                connection=connection
+            )])
+        except Exception as error:
+            failed.append((email, error))
+        else:
+            sent.append(email)
+        stats['attempted'] += 1
+        stats['send_seconds'] += time.monotonic() - started
+    return sent, failed
+
+
+def retry(email, error):
+    """Откладывает письмо после ошибки или снимает его с отправки."""
+    stats['failed'] += 1
+    lease = email.next_attempt_at
+    email.attempts += 1
+    email.last_error = repr(error)
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        stats['dropped'] += 1
+        email.status = OutgoingEmail.Status.FAILED
+    else:
+        email.next_attempt_at = timezone.now() + get_retry_delay(
+            email.attempts
+        )
+    OutgoingEmail.objects.filter(
+        pk=email.pk, next_attempt_at=lease
+    ).update(
+        attempts=email.attempts,
+        last_error=email.last_error,
+        status=email.status,
+        next_attempt_at=email.next_attempt_at
+    )
+
+
+def send_batch(batch_size=None, connection=None):
+    """Отправляет очередную пачку писем из очереди."""
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    pending = OutgoingEmail.objects.filter(
+        status=OutgoingEmail.Status.PENDING,
+        next_attempt_at__lte=timezone.now()
+    ).order_by('next_attempt_at', 'id').values('pk')[:batch_size]
+    return send_emails(
+        OutgoingEmail.objects.filter(pk__in=pending), connection
+    )
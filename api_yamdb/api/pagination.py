@@ -0,0 +1,251 @@
+"""Пагинация с дешёвым подсчётом количества и курсорный режим."""
+import binascii
+import heapq
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ParseError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class CountQuerySetPaginator(Paginator):
+    """Пагинатор, который считает объекты отдельной функцией."""
+
+    def __init__(self, object_list, per_page, get_count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.get_count = get_count
+
+    @cached_property
+    def count(self):
+        return self.get_count()
+
+
+class CountQuerySetPagination(PageNumberPagination):
+    """
+    Постраничная пагинация, считающая объекты по упрощённому запросу.
+    Вьюсет может определить get_count_queryset() - запрос только
+    с фильтрами, без аннотаций, сортировки и лишних JOIN.
+    Если количество превышает COUNT_ESTIMATE_THRESHOLD из настроек,
+    отдаётся оценка планировщика (для PostgreSQL).
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        get_count_queryset = getattr(view, 'get_count_queryset', None)
+        self.count_queryset = (
+            get_count_queryset() if get_count_queryset else queryset
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+    def django_paginator_class(self, object_list, per_page):
+        return CountQuerySetPaginator(
+            object_list, per_page, get_count=self.get_count
+        )
+
+    def get_count(self):
+        """Возвращает точное или оценочное количество объектов."""
+        queryset = self.count_queryset.order_by()
+        threshold = getattr(settings, 'COUNT_ESTIMATE_THRESHOLD', None)
+        connection = connections[queryset.db]
+        # Без оценки планировщика ограниченный COUNT лишь добавил бы
+        # запрос перед точным.
+        if threshold is None or connection.vendor != 'postgresql':
+            return queryset.count()
+        count = queryset[:threshold + 1].count()
+        if count <= threshold:
+            return count
+        return self.estimate_count(queryset) or queryset.count()
+
+    def estimate_count(self, queryset):
+        """Оценка количества строк по плану запроса PostgreSQL."""
+        connection = connections[queryset.db]
+        sql, params = queryset.values('pk').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetPagination(BasePagination):
+    """
+    Курсорная (keyset) пагинация по составному ключу сортировки.
+    Ключ берётся из атрибута keyset_ordering вьюсета или ordering
+    пагинации, последнее поле должно быть уникальным. Курсор -
+    закодированные значения ключа последнего объекта страницы,
+    поэтому глубина не влияет на запрос.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = 'Неверный курсор.'
+    ordering = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = (
+            getattr(view, 'keyset_ordering', None) or self.ordering
+        )
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(position))
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_keyset_filter(self, position):
+        """Условие «строго после позиции» для составного ключа."""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        position = [
+            getattr(last, field.lstrip('-')) for field in self.ordering
+        ]
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(position)
+        )
+
+    def encode_cursor(self, position):
+        data = json.dumps(position, default=str, separators=(',', ':'))
+        return urlsafe_b64encode(data.encode()).decode()
+
+    def decode_cursor(self, model):
+        """Возвращает позицию из курсора или None для первой страницы."""
+        cursor = self.request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            position = json.loads(urlsafe_b64decode(cursor.encode()))
+            if len(position) != len(self.ordering):
+                raise ValueError
+            return [
+                self.to_python(model, field.lstrip('-'), value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (TypeError, ValueError, ValidationError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def to_python(self, model, name, value):
+        return model._meta.get_field(name).to_python(value)
+
+
+class PubDateKeysetPagination(KeysetPagination):
+    """Курсорная пагинация от новых записей к старым."""
+
+    ordering = ('-pub_date', 'id')
+
+
+class FeedPagination(PubDateKeysetPagination):
+    """
+    Курсорная пагинация общей ленты из нескольких запросов.
+    Каждый запрос читается по своему индексу (-pub_date, id) не дальше
+    одной страницы, а результаты сливаются в порядке (-pub_date,
+    номер запроса, id). Номер запроса входит в курсор, чтобы записи
+    разных моделей с одинаковым временем не терялись и не повторялись.
+    """
+
+    ordering = ('-pub_date', 'feed_rank', 'id')
+
+    def paginate_querysets(self, querysets, request):
+        """Возвращает страницу объектов с атрибутом feed_rank."""
+        self.request = request
+        position = self.decode_cursor(querysets[0].model)
+        streams = []
+        for rank, queryset in enumerate(querysets):
+            queryset = queryset.order_by('-pub_date', 'id')
+            if position is not None:
+                queryset = queryset.filter(
+                    self.get_feed_filter(position, rank)
+                )
+            rows = list(queryset[:self.page_size + 1])
+            for obj in rows:
+                obj.feed_rank = rank
+            streams.append(rows)
+        results = list(islice(
+            heapq.merge(*streams, key=self.get_sort_key, reverse=True),
+            self.page_size + 1
+        ))
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_sort_key(self, obj):
+        return obj.pub_date, -obj.feed_rank, -obj.id
+
+    def get_feed_filter(self, position, rank):
+        """Условие «после позиции» для запроса с номером rank."""
+        pub_date, position_rank, pk = position
+        if rank > position_rank:
+            return Q(pub_date__lte=pub_date)
+        if rank < position_rank:
+            return Q(pub_date__lt=pub_date)
+        return Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__gt=pk)
+
+    def to_python(self, model, name, value):
+        if name == 'feed_rank':
+            if not isinstance(value, int):
+                raise ValueError
+            return value
+        return super().to_python(model, name, value)
+
+
+class KeysetOrPageNumberPagination(CountQuerySetPagination):
+    """
+    Постраничная пагинация, переключающаяся в курсорный режим
+    при наличии параметра ?cursor= у вьюсетов с keyset_ordering.
+    Параметры из cursor_incompatible_params вьюсета меняют сортировку,
+    и курсор вместе с ними отклоняется.
+    """
+
+    keyset_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        cursor_param = self.keyset_pagination_class.cursor_query_param
+        if (
+            getattr(view, 'keyset_ordering', None)
+            and cursor_param in request.query_params
+        ):
+            for param in getattr(view, 'cursor_incompatible_params', ()):
+                if param in request.query_params:
+                    raise ParseError(
+                        f'Курсор нельзя использовать с параметром {param}.'
+                    )
+            self.keyset = self.keyset_pagination_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
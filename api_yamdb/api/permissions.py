@@ -9,6 +9,14 @@ class IsAdmin(permissions.BasePermission):
                 and request.user.is_admin)
 
 
+class IsAdminOrModerator(permissions.BasePermission):
+    """Разрешает доступ администраторам и модераторам."""
+
+    def has_permission(self, request, view):
+        return (request.user.is_authenticated
+                and (request.user.is_admin or request.user.is_moderator))
+
+
 class IsAdminOrReadOnly(permissions.BasePermission):
     """Разрешает создание/изменение/удаление только администраторам."""
     """Всем остальным - только чтение."""
@@ -39,7 +47,7 @@ class IsOwnerAdminModeratorOrReadOnly(permissions.BasePermission):
             return True
 
         return (
-            obj.author == request.user
+            obj.author_id == request.user.id
             or request.user.is_moderator
             or request.user.is_admin
         )
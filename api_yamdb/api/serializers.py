@@ -1,29 +1,71 @@
 """Сериализаторы для категорий, жанров и произведений."""
-from django.conf import settings
+from operator import attrgetter
+
 from django.contrib.auth import get_user_model
-from django.contrib.auth.tokens import default_token_generator
 from django.core.exceptions import ValidationError
-from django.core.mail import send_mail
-from django.db import IntegrityError
+from django.db import IntegrityError, models
+from django.db.models import ExpressionWrapper, Q, Value
+from django.db.models.functions import Lower
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
-from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework.validators import UniqueValidator
 
+from .authentication import get_access_token
+from .confirmation import check_confirmation_code, issue_confirmation_code
 from .constants import MAX_LENGTH_EMAIL
+from .outbox import enqueue_email
+from .usernames import usernames
 from reviews.constants import USERNAME_MAX_LENGTH
 from reviews.models import Category, Comment, Genre, Review, Title
 from reviews.validators import validate_username
 
 User = get_user_model()
 
+REVIEW_EXISTS_MESSAGE = 'Вы уже оставляли отзыв на это произведение.'
+
+
+class SparseFieldsSerializerMixin:
+    """
+    Оставляет только поля из context['fields'], если они заданы.
+    Вложенные сериализаторы выводятся целиком.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = self.context.get('fields')
+        if requested is None or self.parent not in (None, self.root):
+            return fields
+        return {
+            name: field for name, field in fields.items()
+            if name in requested
+        }
+
+
+class AuthorUsernameField(serializers.Field):
+    """
+    Имя автора без загрузки пользователя: из аннотации author_username,
+    из уже загруженного author или из общего кеша имён по author_id.
+    """
 
-class ReviewsSerializer(serializers.ModelSerializer):
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        username = getattr(instance, 'author_username', None)
+        if username is not None:
+            return username
+        if instance._meta.get_field('author').is_cached(instance):
+            return instance.author.username
+        return usernames.get(instance.author_id)
+
+
+class ReviewsSerializer(SparseFieldsSerializerMixin,
+                        serializers.ModelSerializer):
     """Сериализатор для работы с моделью отзыв."""
 
-    author = serializers.SlugRelatedField(
-        slug_field='username',
-        read_only=True,
-    )
+    author = AuthorUsernameField()
 
     class Meta:
         model = Review
@@ -33,34 +75,28 @@ class ReviewsSerializer(serializers.ModelSerializer):
             'author',
             'score',
             'pub_date',
+            'comment_count',
         )
 
-    def validate(self, data):
-        """
-        Проверяет, что пользователь не оставлял
-        отзыв на это произведение ранее.
-        """
-        request = self.context.get('request')
-        if request and request.method == 'POST':
-            title_id = self.context['view'].get_title().id
-            author = request.user
-            if Review.objects.filter(
-                title_id=title_id,
-                author=author
-            ).exists():
-                raise serializers.ValidationError(
-                    'Вы уже оставляли отзыв на это произведение.'
-                )
-        return data
+
+class ReviewBatchItemSerializer(serializers.ModelSerializer):
+    """
+    Отзыв из пакета: проверяет только сами поля.
+    Произведения и повторные отзывы проверяются для всего пакета сразу.
+    """
+
+    title_id = serializers.IntegerField(min_value=1)
+
+    class Meta:
+        model = Review
+        fields = ('title_id', 'text', 'score')
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsSerializerMixin,
+                        serializers.ModelSerializer):
     """Сериализатор для работы с моделью комментарий."""
 
-    author = serializers.SlugRelatedField(
-        read_only=True,
-        slug_field='username'
-    )
+    author = AuthorUsernameField()
 
     class Meta:
         model = Comment
@@ -72,6 +108,45 @@ class CommentSerializer(serializers.ModelSerializer):
         )
 
 
+class ReviewWithCommentsSerializer(ReviewsSerializer):
+    """Отзыв с последними комментариями (?include=comments)."""
+
+    comments = CommentSerializer(
+        many=True, read_only=True, source='latest_comments'
+    )
+
+    class Meta(ReviewsSerializer.Meta):
+        fields = ReviewsSerializer.Meta.fields + ('comments',)
+
+
+class ActivityTitleMixin(serializers.Serializer):
+    """
+    Произведение записи из ленты: id и название
+    из аннотации title_name, без загрузки произведения.
+    """
+
+    title = serializers.SerializerMethodField()
+
+    def get_title(self, obj):
+        return {'id': obj.title_id, 'name': obj.title_name}
+
+
+class UserReviewSerializer(ActivityTitleMixin, ReviewsSerializer):
+    """Отзыв в ленте пользователя или модерации."""
+
+    class Meta(ReviewsSerializer.Meta):
+        fields = ReviewsSerializer.Meta.fields + ('title',)
+
+
+class UserCommentSerializer(ActivityTitleMixin, CommentSerializer):
+    """Комментарий в ленте пользователя или модерации."""
+
+    review = serializers.IntegerField(source='review_id', read_only=True)
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ('review', 'title')
+
+
 class AdminUserSerializer(serializers.ModelSerializer):
     """Сериализатор для пользователей."""
 
@@ -80,6 +155,24 @@ class AdminUserSerializer(serializers.ModelSerializer):
         fields = (
             'username', 'email', 'role', 'first_name', 'last_name', 'bio',
         )
+        # Уникальность без учёта регистра, как в ограничениях модели.
+        extra_kwargs = {
+            'username': {'validators': (
+                validate_username,
+                UniqueValidator(
+                    User.objects.all(),
+                    message='Этот username уже занят.',
+                    lookup='iexact'
+                ),
+            )},
+            'email': {'validators': (
+                UniqueValidator(
+                    User.objects.all(),
+                    message='Эта почта уже занята.',
+                    lookup='iexact'
+                ),
+            )},
+        }
 
 
 class PublicUserSerializer(serializers.Serializer):
@@ -93,28 +186,67 @@ class PublicUserSerializer(serializers.Serializer):
         max_length=MAX_LENGTH_EMAIL,
     )
 
+    def find_users(self, username, email):
+        """
+        Одним запросом по индексам LOWER() находит пользователей,
+        занявших username или почту без учёта регистра (не больше двух).
+        """
+        username, email = Lower(Value(username)), Lower(Value(email))
+        return list(User.objects.alias(
+            username_lower=Lower('username'),
+            email_lower=Lower('email')
+        ).filter(
+            Q(username_lower=username) | Q(email_lower=email)
+        ).annotate(
+            username_taken=ExpressionWrapper(
+                Q(username_lower=username), output_field=models.BooleanField()
+            ),
+            email_taken=ExpressionWrapper(
+                Q(email_lower=email), output_field=models.BooleanField()
+            )
+        ).only('username', 'email').order_by()[:2])
+
     def create(self, validated_data):
-        try:
-            user, _ = User.objects.get_or_create(
-                username=validated_data['username'],
-                email=validated_data['email'])
-            self.send_email(user)
-        except IntegrityError:
-            raise serializers.ValidationError({
-                'detail': 'Данные username или почта уже заняты.'
-            })
+        """
+        Новый пользователь создаётся, зарегистрированному с теми же
+        username и почтой код отправляется повторно, иначе - ошибка
+        с указанием занятых полей.
+        """
+        username = validated_data['username']
+        users = self.find_users(username, validated_data['email'])
+        if not users:
+            try:
+                user = User.objects.create(**validated_data)
+            except IntegrityError:
+                raise serializers.ValidationError({
+                    'detail': 'Данные username или почта уже заняты.'
+                })
+        elif (
+            len(users) == 1
+            and users[0].username == username
+            and users[0].email_taken
+        ):
+            user, = users
+        else:
+            errors = {}
+            if any(user.username_taken for user in users):
+                errors['username'] = ['Этот username уже занят.']
+            if any(user.email_taken for user in users):
+                errors['email'] = ['Эта почта уже занята.']
+            raise serializers.ValidationError(errors)
+        self.send_email(user)
         return user
 
     def send_email(self, user):
-        send_mail(
-            subject='Код подтверждения YaMDB',
-            message=f'Привет, {user.username}!\n\n'
-                    'Ваш код подтверждения: '
-                    f'{default_token_generator.make_token(user)}\n\n'
-                    'Используйте его для входа в систему.',
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            fail_silently=True,
+        """Ставит письмо с кодом в очередь, не дожидаясь отправки."""
+        enqueue_email(
+            f'signup:{user.pk}',
+            user.email,
+            'Код подтверждения YaMDB',
+            f'Привет, {user.username}!\n\n'
+            'Ваш код подтверждения: '
+            f'{issue_confirmation_code(user)}\n\n'
+            'Используйте его для входа в систему.'
         )
 
 
@@ -125,17 +257,17 @@ class TokenCreationSerializer(serializers.Serializer):
     confirmation_code = serializers.CharField()
 
     def validate(self, data):
-        user = get_object_or_404(User, username=data['username'])
-        if not default_token_generator.check_token(
-                user, data['confirmation_code']
-        ):
+        user = get_object_or_404(
+            User.objects.select_related('confirmation_code'),
+            username=data['username']
+        )
+        if not check_confirmation_code(user, data['confirmation_code']):
             raise ValidationError("Неправильный код подтверждения.")
+        data['user'] = user
         return data
 
     def create(self, validated_data):
-        user = get_object_or_404(User, username=validated_data['username'])
-        access = AccessToken.for_user(user)
-        return {'token': str(access)}
+        return {'token': str(get_access_token(validated_data['user']))}
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -156,6 +288,44 @@ class GenreSerializer(serializers.ModelSerializer):
         lookup_field = 'slug'
 
 
+class TitleListSerializer(serializers.ListSerializer):
+    """
+    Быстрая сериализация списка произведений.
+    Строит словари напрямую из объектов с подгруженными
+    категорией и жанрами, минуя поля DRF для каждой строки.
+    Результат совпадает с TitleReadSerializer.
+    """
+
+    representation = {
+        'id': attrgetter('id'),
+        'name': attrgetter('name'),
+        'year': attrgetter('year'),
+        'rating': attrgetter('rating'),
+        'review_count': attrgetter('review_count'),
+        'description': attrgetter('description'),
+        'genre': lambda title: [
+            {'name': genre.name, 'slug': genre.slug}
+            for genre in title.genre.all()
+        ],
+        'category': lambda title: (
+            {'name': title.category.name, 'slug': title.category.slug}
+            if title.category is not None else None
+        ),
+    }
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.Manager) else data
+        fields = self.context.get('fields')
+        getters = [
+            (name, self.representation[name])
+            for name in (self.representation if fields is None else fields)
+        ]
+        return [
+            {name: get(title) for name, get in getters}
+            for title in iterable
+        ]
+
+
 class TitleSerializer(serializers.ModelSerializer):
     """Сериализатор для произведений."""
 
@@ -174,15 +344,17 @@ class TitleSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = ('id', 'name', 'year', 'rating',
+        fields = ('id', 'name', 'year', 'rating', 'review_count',
                   'description', 'genre', 'category')
+        list_serializer_class = TitleListSerializer
 
     def to_representation(self, instance):
-        serializer = TitleReadSerializer(instance)
+        serializer = TitleReadSerializer(instance, context=self.context)
         return serializer.data
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class TitleReadSerializer(SparseFieldsSerializerMixin,
+                          serializers.ModelSerializer):
     """Сериализатор для чтения произведений."""
 
     genre = GenreSerializer(many=True)
@@ -191,5 +363,5 @@ class TitleReadSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = ('id', 'name', 'year', 'rating',
+        fields = ('id', 'name', 'year', 'rating', 'review_count',
                   'description', 'genre', 'category')
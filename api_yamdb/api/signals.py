@@ -0,0 +1,114 @@
+"""Сброс версий данных при изменениях для кеша и условных запросов."""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import (
+    CATALOG_VERSION,
+    LIST_VERSION,
+    comments_version,
+    data_versions,
+    reviews_version,
+    title_version,
+    token_version,
+    token_versions
+)
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from .usernames import usernames
+from reviews.signals import title_rating_changed
+
+User = get_user_model()
+
+
+def bump_titles(*title_ids):
+    """Сбрасывает список и карточки произведений после коммита."""
+    names = (LIST_VERSION, *(title_version(pk) for pk in title_ids))
+    transaction.on_commit(lambda: data_versions.bump(*names))
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def invalidate_title(sender, instance, **kwargs):
+    bump_titles(instance.pk)
+
+
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+def invalidate_genre_title(sender, instance, **kwargs):
+    bump_titles(instance.title_id)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        bump_titles(instance.pk)
+    elif pk_set:
+        bump_titles(*pk_set)
+    else:
+        bump_titles()
+        transaction.on_commit(lambda: data_versions.bump(CATALOG_VERSION))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_catalog(sender, instance, **kwargs):
+    """Жанры и категории входят в каждое произведение."""
+    transaction.on_commit(
+        lambda: data_versions.bump(LIST_VERSION, CATALOG_VERSION)
+    )
+
+
+@receiver(title_rating_changed)
+def invalidate_rating(sender, title_ids, **kwargs):
+    bump_titles(*title_ids)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_reviews(sender, instance, **kwargs):
+    name = reviews_version(instance.title_id)
+    transaction.on_commit(lambda: data_versions.bump(name))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comments(sender, instance, origin=None, **kwargs):
+    """
+    Счётчик и последние комментарии входят в список отзывов,
+    поэтому он тоже сбрасывается.
+    Каскадное удаление отзыва сбрасывает его само.
+    """
+    names = [comments_version(instance.review_id)]
+    if not isinstance(origin, (Review, Title)) and getattr(
+        origin, 'model', None
+    ) not in (Review, Title):
+        names.append(reviews_version(instance.review.title_id))
+    transaction.on_commit(lambda: data_versions.bump(*names))
+
+
+@receiver(post_save, sender=User)
+def invalidate_username(sender, instance, created, update_fields, **kwargs):
+    if created or (update_fields and 'username' not in update_fields):
+        return
+    transaction.on_commit(usernames.invalidate)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_username(sender, instance, **kwargs):
+    transaction.on_commit(usernames.invalidate)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_token_claims(sender, instance, created=False, **kwargs):
+    """Токены с прежними ролью и именем перестают считаться верными."""
+    if created:
+        return
+    name = token_version(instance.pk)
+    transaction.on_commit(lambda: token_versions.bump(name))
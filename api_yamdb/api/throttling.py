@@ -0,0 +1,172 @@
+"""
+Ограничение частоты запросов корзинами токенов.
+Корзина ёмкостью N пополняется на N токенов за период, запрос
+забирает один токен. Лимиты задаются в DEFAULT_THROTTLE_RATES
+ключами '<scope>.<kind>', например 'signup.ip': '20/min';
+scope берётся из throttle_scope представления.
+"""
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from reviews.constants import USERNAME_MAX_LENGTH
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+# Счётчики процесса: '<scope>.<kind>.allowed' и '<scope>.<kind>.rejected'.
+stats = Counter()
+
+
+def parse_rate(rate):
+    """'20/min' -> (20, 60): ёмкость корзины и период в секундах."""
+    number, period = rate.split('/')
+    return int(number), PERIODS[period[0]]
+
+
+def refill(bucket, capacity, period, now):
+    """Токены корзины на момент now и решение по запросу."""
+    tokens, updated = bucket[:2] if bucket else (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) * capacity / period)
+    if tokens >= 1:
+        return tokens - 1, True, 0
+    return tokens, False, (1 - tokens) * period / capacity
+
+
+class LocalBuckets:
+    """
+    Корзины в памяти процесса без блокировок: запись в словарь
+    атомарна, а при гонке потоков теряется лишь часть списаний.
+    При переполнении отбрасываются корзины, успевшие наполниться.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.data = {}
+
+    def take(self, key, capacity, period):
+        now = time.monotonic()
+        tokens, allowed, wait = refill(
+            self.data.get(key), capacity, period, now
+        )
+        full_at = now + (capacity - tokens) * period / capacity
+        self.data[key] = (tokens, now, full_at)
+        if len(self.data) > self.maxsize:
+            self.evict(now)
+        return allowed, wait
+
+    def evict(self, now):
+        data = {
+            key: bucket for key, bucket in list(self.data.items())
+            if bucket[2] > now
+        }
+        if len(data) > self.maxsize:
+            data = dict(list(data.items())[-(self.maxsize // 2):])
+        self.data = data
+
+    def clear(self):
+        self.data = {}
+
+
+class CacheBuckets:
+    """Корзины в общем кеше Django для нескольких процессов."""
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def take(self, key, capacity, period):
+        now = time.time()
+        key = f'throttle:{key}'
+        tokens, allowed, wait = refill(
+            self.cache.get(key), capacity, period, now
+        )
+        self.cache.set(key, (tokens, now), period)
+        return allowed, wait
+
+
+local_buckets = LocalBuckets(getattr(settings, 'THROTTLE_STORE_SIZE', 100000))
+
+
+def get_buckets():
+    """Хранилище корзин: кеш THROTTLE_CACHE или память процесса."""
+    alias = getattr(settings, 'THROTTLE_CACHE', None)
+    if alias is None:
+        return local_buckets
+    return CacheBuckets(caches[alias])
+
+
+class BucketThrottle(BaseThrottle):
+    """
+    Базовая корзина: ключ запроса даёт get_key, лимит берётся
+    из DEFAULT_THROTTLE_RATES. Без лимита или ключа запрос пропускается.
+    Проверка не обращается к базе данных.
+    """
+
+    kind = None
+    default_scope = None
+
+    def get_key(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        scope = getattr(view, 'throttle_scope', None) or self.default_scope
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(f'{scope}.{self.kind}')
+        if rate is None:
+            return True
+        key = self.get_key(request, view)
+        if key is None:
+            return True
+        allowed, wait = get_buckets().take(
+            f'{scope}.{self.kind}:{key}', *parse_rate(rate)
+        )
+        if allowed:
+            stats[f'{scope}.{self.kind}.allowed'] += 1
+        else:
+            stats[f'{scope}.{self.kind}.rejected'] += 1
+            self.wait_seconds = wait
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class IPThrottle(BucketThrottle):
+    """Корзина на IP-адрес клиента."""
+
+    kind = 'ip'
+
+    def get_key(self, request, view):
+        return self.get_ident(request)
+
+
+class UsernameThrottle(BucketThrottle):
+    """Корзина на username из тела запроса (регистрация, токен)."""
+
+    kind = 'username'
+
+    def get_key(self, request, view):
+        data = request.data
+        username = data.get('username') if hasattr(data, 'get') else None
+        if not username:
+            return None
+        return str(username)[:USERNAME_MAX_LENGTH].lower()
+
+
+class UserThrottle(BucketThrottle):
+    """Корзина на пользователя для изменяющих запросов."""
+
+    kind = 'user'
+    default_scope = 'write'
+
+    def get_key(self, request, view):
+        if (
+            request.method in SAFE_METHODS
+            or not request.user.is_authenticated
+        ):
+            return None
+        return request.user.pk
@@ -2,10 +2,15 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from .views import (
+    CacheStatsView,
     CategoryViewSet,
     CommentsViewSet,
+    ExportView,
     GenreViewSet,
+    ModerationFeedView,
+    ReviewBatchView,
     ReviewsViewSet,
+    ThrottleStatsView,
     TitleViewSet,
     TokenObtainView,
     UserCreateAPIView,
@@ -36,4 +41,21 @@ urlpatterns = [
     path('v1/', include(router_v1.urls)),
     path('v1/auth/signup/', UserCreateAPIView.as_view(), name='create'),
     path('v1/auth/token/', TokenObtainView.as_view(), name='token'),
+    path(
+        'v1/reviews/batch/', ReviewBatchView.as_view(), name='review-batch'
+    ),
+    path(
+        'v1/moderation/feed/', ModerationFeedView.as_view(),
+        name='moderation-feed'
+    ),
+    path(
+        'v1/export/<slug:name>.ndjson', ExportView.as_view(), name='export'
+    ),
+    path(
+        'v1/cache/stats/', CacheStatsView.as_view(), name='cache-stats'
+    ),
+    path(
+        'v1/throttling/stats/', ThrottleStatsView.as_view(),
+        name='throttle-stats'
+    ),
 ]
@@ -0,0 +1,66 @@
+"""Общий для процесса LRU-кеш имён пользователей по id."""
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+from .cache import data_versions
+
+USERNAMES_VERSION = 'usernames'
+
+
+class UsernameCache:
+    """
+    Отображение id пользователя в username с вытеснением LRU.
+    При смене имени любого пользователя меняется версия в общем кеше,
+    и каждый процесс сбрасывает свою копию при следующем обращении.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.data = OrderedDict()
+        self.version = None
+
+    def check_version(self):
+        version, = data_versions.get(USERNAMES_VERSION)
+        if version != self.version:
+            with self.lock:
+                self.data.clear()
+                self.version = version
+
+    def remember(self, user_id, username):
+        with self.lock:
+            self.data[user_id] = username
+            self.data.move_to_end(user_id)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def get_many(self, user_ids):
+        """Возвращает {id: username}, догружая промахи одним запросом."""
+        self.check_version()
+        found = {}
+        with self.lock:
+            for user_id in user_ids:
+                if user_id in self.data:
+                    self.data.move_to_end(user_id)
+                    found[user_id] = self.data[user_id]
+        missing = set(user_ids).difference(found)
+        if missing:
+            for user_id, username in get_user_model().objects.filter(
+                id__in=missing
+            ).values_list('id', 'username'):
+                self.remember(user_id, username)
+                found[user_id] = username
+        return found
+
+    def get(self, user_id):
+        return self.get_many((user_id,)).get(user_id)
+
+    def invalidate(self):
+        """Сбрасывает кеш во всех процессах."""
+        data_versions.bump(USERNAMES_VERSION)
+
+
+usernames = UsernameCache(getattr(settings, 'USERNAME_CACHE_SIZE', 10000))
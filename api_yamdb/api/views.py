@@ -1,92 +1,289 @@
 """Представления для категорий, жанров и произведений."""
+from collections import Counter
+
 from django.contrib.auth import get_user_model
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.db.models import F, Prefetch
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_vary_headers
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import (
     filters,
     generics,
     permissions,
+    serializers,
+    status,
     viewsets
 )
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
-from reviews.models import Category, Genre, Review, Title
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    GenreTitle,
+    Review,
+    Title
+)
+from reviews.signals import change_rating
+from .cache import (
+    CATALOG_VERSION,
+    LIST_VERSION,
+    comments_version,
+    data_versions,
+    reviews_version,
+    title_cache,
+    title_version
+)
+from .constants import (
+    COMMENTS_PREVIEW_LIMIT,
+    COMMENTS_PREVIEW_MAX_LIMIT,
+    REVIEW_BATCH_ATTEMPTS,
+    REVIEW_BATCH_MAX_SIZE,
+    TOP_TITLES_LIMIT
+)
+from .export import EXPORTS, iter_gzip, iter_ndjson
 from .filters import TitleFilter
+from .pagination import FeedPagination, PubDateKeysetPagination
 from .permissions import (
     IsAdmin,
+    IsAdminOrModerator,
     IsAdminOrReadOnly,
     IsOwnerAdminModeratorOrReadOnly
 )
 from .serializers import (
+    REVIEW_EXISTS_MESSAGE,
     AdminUserSerializer,
     CategorySerializer,
     CommentSerializer,
     GenreSerializer,
     PublicUserSerializer,
+    ReviewBatchItemSerializer,
     ReviewsSerializer,
+    ReviewWithCommentsSerializer,
     TitleSerializer,
-    TokenCreationSerializer
+    TokenCreationSerializer,
+    UserCommentSerializer,
+    UserReviewSerializer
+)
+from .throttling import IPThrottle, UsernameThrottle, stats
+from .usernames import USERNAMES_VERSION
+from .viewsets import (
+    CategoryGenreViewSetBase,
+    NestedParentMixin,
+    SparseField,
+    SparseFieldsMixin,
+    VersionedReadMixin
 )
-from .viewsets import CategoryGenreViewSetBase
 
 User = get_user_model()
 
 
-class ReviewsViewSet(viewsets.ModelViewSet):
+class ReviewsViewSet(VersionedReadMixin, SparseFieldsMixin,
+                     NestedParentMixin, viewsets.ModelViewSet):
     """Управление отзывами на произведения."""
 
     http_method_names = ('get', 'post', 'patch', 'delete', 'head', 'options')
     serializer_class = ReviewsSerializer
     permission_classes = (IsOwnerAdminModeratorOrReadOnly,)
+    keyset_ordering = ('-pub_date', 'id')
+    sparse_fields = {
+        'id': SparseField('id'),
+        'text': SparseField('text'),
+        'author': SparseField(
+            'author',
+            annotations={'author_username': F('author__username')}
+        ),
+        'score': SparseField('score'),
+        'pub_date': SparseField('pub_date'),
+        'comment_count': SparseField('comment_count'),
+        'comments': SparseField(),
+    }
 
     def get_title(self):
-        """Возвращает произведение по id из URL."""
-        return get_object_or_404(Title, id=self.kwargs.get('title_id'))
+        """Возвращает произведение по id из URL (один раз за запрос)."""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, id=self.kwargs.get('title_id')
+            )
+        return self._title
+
+    get_parent = get_title
+
+    def get_comments_limit(self):
+        """
+        Сколько последних комментариев вложить в каждый отзыв списка
+        (?include=comments&comments_limit=N) или None.
+        """
+        if self.action != 'list':
+            return None
+        include = self.request.query_params.get('include')
+        if include is None:
+            return None
+        if include != 'comments':
+            raise ValidationError({'include': 'Допустимо значение comments.'})
+        fields = self.get_sparse_fields()
+        if fields is not None and 'comments' not in fields:
+            return None
+        limit = self.request.query_params.get(
+            'comments_limit', COMMENTS_PREVIEW_LIMIT
+        )
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            limit = 0
+        if not 0 < limit <= COMMENTS_PREVIEW_MAX_LIMIT:
+            raise ValidationError({
+                'comments_limit': (
+                    f'Укажите число от 1 до {COMMENTS_PREVIEW_MAX_LIMIT}.'
+                )
+            })
+        return limit
+
+    def get_serializer_class(self):
+        if self.get_comments_limit() is not None:
+            return ReviewWithCommentsSerializer
+        return super().get_serializer_class()
 
     def get_queryset(self):
-        """Список отзывов текущего произведения."""
-        return self.get_title().reviews.all()
+        """
+        Список отзывов текущего произведения.
+        Последние комментарии всех отзывов страницы загружаются
+        одним запросом: срез в Prefetch Django выполняет через
+        ROW_NUMBER() OVER (PARTITION BY review_id ...).
+        """
+        queryset = self.prune_queryset(
+            Review.objects.filter(title_id=self.kwargs.get('title_id'))
+        )
+        limit = self.get_comments_limit()
+        if limit is None:
+            return queryset
+        return queryset.prefetch_related(Prefetch(
+            'comments',
+            queryset=Comment.objects.annotate(
+                author_username=F('author__username')
+            ).order_by('-pub_date', 'id')[:limit],
+            to_attr='latest_comments'
+        ))
+
+    def get_version_names(self):
+        # Имена авторов входят в ответ и меняются вместе с USERNAMES_VERSION.
+        return (
+            reviews_version(self.kwargs.get('title_id')), USERNAMES_VERSION
+        )
 
     def perform_create(self, serializer):
-        """Создание отзыва с привязкой к автору и произведению."""
-        serializer.save(author=self.request.user, title=self.get_title())
+        """
+        Создание отзыва с привязкой к автору и произведению.
+        Рейтинг и счётчик отзывов меняются в той же транзакции.
+        Повторный отзыв отсекает ограничение unique_author_title:
+        отдельная проверка перед вставкой не защищает от гонки
+        параллельных запросов и стоит лишнего запроса.
+        """
+        title = self.get_title()
+        try:
+            with transaction.atomic():
+                serializer.save(author=self.request.user, title=title)
+        except IntegrityError:
+            if not Review.objects.filter(
+                author=self.request.user, title=title
+            ).exists():
+                raise
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [REVIEW_EXISTS_MESSAGE]
+            })
+
+    def lock_rating_state(self, review):
+        """
+        Перечитывает вклад отзыва в рейтинг под блокировкой строки:
+        отзыв, загруженный до параллельной правки, не сдвинет сумму оценок.
+        """
+        state = Review.objects.select_for_update().filter(
+            pk=review.pk
+        ).values_list('title_id', 'score').first()
+        if state is None:
+            raise NotFound('Отзыв уже удалён.')
+        review._rating_state = state
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        """Изменение отзыва в одной транзакции с рейтингом."""
+        self.lock_rating_state(serializer.instance)
+        serializer.save()
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        self.lock_rating_state(instance)
+        instance.delete()
 
 
-class CommentsViewSet(viewsets.ModelViewSet):
+class CommentsViewSet(VersionedReadMixin, SparseFieldsMixin,
+                      NestedParentMixin, viewsets.ModelViewSet):
     """Управление комментариями к отзывам."""
 
     http_method_names = ('get', 'post', 'patch',
                          'delete', 'head', 'options')
     serializer_class = CommentSerializer
     permission_classes = (IsOwnerAdminModeratorOrReadOnly,)
+    keyset_ordering = ('-pub_date', 'id')
+    sparse_fields = {
+        'id': SparseField('id'),
+        'text': SparseField('text'),
+        'author': SparseField(
+            'author',
+            annotations={'author_username': F('author__username')}
+        ),
+        'pub_date': SparseField('pub_date'),
+    }
 
     def get_review(self):
-        """Возвращает отзыв по id из URL """
-        """(с проверкой принадлежности к произведению)."""
-        title_id = self.kwargs.get('title_id')
-        review_id = self.kwargs.get('review_id')
-        return get_object_or_404(
-            Review,
-            id=review_id,
-            title_id=title_id
-        )
+        """
+        Возвращает отзыв по id из URL (один раз за запрос)
+        с проверкой принадлежности к произведению.
+        """
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review,
+                id=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id')
+            )
+        return self._review
+
+    get_parent = get_review
 
     def get_queryset(self):
         """Список комментариев текущего отзыва."""
-        return self.get_review().comments.all()
+        return self.prune_queryset(Comment.objects.filter(
+            review_id=self.kwargs.get('review_id'),
+            review__title_id=self.kwargs.get('title_id')
+        ))
+
+    def get_version_names(self):
+        return (
+            comments_version(self.kwargs.get('review_id')), USERNAMES_VERSION
+        )
 
+    @transaction.atomic
     def perform_create(self, serializer):
-        """Создание комментария с привязкой к автору и отзыву."""
-        review = self.get_review()
+        """
+        Создание комментария с привязкой к автору и отзыву.
+        Счётчик комментариев отзыва меняется в той же транзакции.
+        """
         serializer.save(
             author=self.request.user,
-            review=review
+            review=self.get_review()
         )
 
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+
 
 class UserViewSet(viewsets.ModelViewSet):
     """Вьюсет для управления пользователями."""
@@ -95,8 +292,9 @@ class UserViewSet(viewsets.ModelViewSet):
     serializer_class = AdminUserSerializer
     lookup_field = 'username'
     permission_classes = (IsAdmin,)
-    filter_backends = (filters.SearchFilter,)
+    filter_backends = (filters.SearchFilter, DjangoFilterBackend)
     search_fields = ('=username',)
+    filterset_fields = ('role',)
     http_method_names = ('get', 'post', 'patch', 'delete')
 
     @action(
@@ -104,22 +302,82 @@ class UserViewSet(viewsets.ModelViewSet):
         permission_classes=(IsAuthenticated,)
     )
     def me(self, request):
+        # request.user собран из токена, профиль читается целиком.
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == 'PATCH':
             serializer = self.get_serializer(
-                request.user, data=request.data, partial=True
+                user, data=request.data, partial=True
             )
             serializer.is_valid(raise_exception=True)
-            serializer.save(role=self.request.user.role)
+            serializer.save(role=user.role)
             return Response(serializer.data)
-        serializer = self.get_serializer(request.user)
+        serializer = self.get_serializer(user)
         return Response(serializer.data)
 
+    def get_reviews(self, **author):
+        return Review.objects.filter(**author).annotate(
+            author_username=F('author__username'),
+            title_name=F('title__name')
+        )
+
+    def list_activity(self, queryset, serializer_class):
+        """Страница ленты пользователя по индексу (author, -pub_date)."""
+        page = self.paginate_queryset(queryset)
+        if not page and self.detail:
+            self.get_object()
+        serializer = serializer_class(
+            page, many=True, context=self.get_serializer_context()
+        )
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        detail=False, url_path='me/reviews',
+        permission_classes=(IsAuthenticated,),
+        pagination_class=PubDateKeysetPagination
+    )
+    def me_reviews(self, request):
+        """Отзывы текущего пользователя, от новых к старым."""
+        return self.list_activity(
+            self.get_reviews(author_id=request.user.id), UserReviewSerializer
+        )
+
+    @action(
+        detail=False, url_path='me/comments',
+        permission_classes=(IsAuthenticated,),
+        pagination_class=PubDateKeysetPagination
+    )
+    def me_comments(self, request):
+        """Комментарии текущего пользователя, от новых к старым."""
+        return self.list_activity(
+            Comment.objects.filter(author_id=request.user.id).annotate(
+                author_username=F('author__username'),
+                title_id=F('review__title_id'),
+                title_name=F('review__title__name')
+            ),
+            UserCommentSerializer
+        )
+
+    @action(
+        detail=True, permission_classes=(IsAdminOrModerator,),
+        pagination_class=PubDateKeysetPagination
+    )
+    def reviews(self, request, username):
+        """
+        Отзывы пользователя для модерации.
+        Пользователь загружается, только если отзывов не нашлось.
+        """
+        return self.list_activity(
+            self.get_reviews(author__username=username), UserReviewSerializer
+        )
+
 
 class UserCreateAPIView(APIView):
     """Самостоятельная регистрация пользователей."""
 
     queryset = User.objects.all()
     permission_classes = (AllowAny,)
+    throttle_classes = (IPThrottle, UsernameThrottle)
+    throttle_scope = 'signup'
 
     def post(self, request, *args, **kwargs):
         serializer = PublicUserSerializer(data=request.data)
@@ -133,6 +391,8 @@ class TokenObtainView(generics.CreateAPIView):
 
     serializer_class = TokenCreationSerializer
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (IPThrottle, UsernameThrottle)
+    throttle_scope = 'token'
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -141,6 +401,173 @@ class TokenObtainView(generics.CreateAPIView):
         return Response(token_data)
 
 
+class ReviewBatchView(APIView):
+    """
+    Пакетная отправка отзывов: список {title_id, text, score}.
+    Произведения и повторные отзывы проверяются двумя запросами на весь
+    пакет, подходящие отзывы сохраняются одним bulk_create, а рейтинг
+    каждого затронутого произведения обновляется один раз.
+    В ответе результат для каждого элемента в исходном порядке;
+    если параллельные изменения мешают сохранить пакет за
+    REVIEW_BATCH_ATTEMPTS попыток, корректные элементы получают 409.
+    """
+
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request):
+        items = request.data
+        if not isinstance(items, list) or not (
+            0 < len(items) <= REVIEW_BATCH_MAX_SIZE
+        ):
+            raise ValidationError({'detail': (
+                'Ожидается список от 1 до '
+                f'{REVIEW_BATCH_MAX_SIZE} отзывов.'
+            )})
+        results = [None] * len(items)
+        valid = {}
+        for index, item in enumerate(items):
+            serializer = ReviewBatchItemSerializer(data=item)
+            if serializer.is_valid():
+                valid[index] = serializer.validated_data
+            else:
+                results[index] = self.error(serializer.errors)
+        for _ in range(REVIEW_BATCH_ATTEMPTS):
+            try:
+                reviews = self.create_reviews(request.user, valid, results)
+                break
+            except IntegrityError:
+                # Отзыв или произведение успели изменить параллельно:
+                # следующая попытка заново проверит весь пакет.
+                continue
+        else:
+            reviews = {}
+            for index in valid:
+                results[index] = {
+                    'status': status.HTTP_409_CONFLICT,
+                    'errors': {'detail': [
+                        'Пакет конфликтует с параллельными изменениями, '
+                        'повторите запрос.'
+                    ]},
+                }
+        for index, review in reviews.items():
+            results[index] = {
+                'status': status.HTTP_201_CREATED,
+                'review': ReviewsSerializer(review).data,
+            }
+        return Response({'results': results})
+
+    def error(self, errors):
+        return {'status': status.HTTP_400_BAD_REQUEST, 'errors': errors}
+
+    @transaction.atomic
+    def create_reviews(self, author, valid, results):
+        """Сохраняет отзывы без конфликтов, возвращает {индекс: отзыв}."""
+        title_ids = {data['title_id'] for data in valid.values()}
+        titles = set(Title.objects.filter(
+            pk__in=title_ids
+        ).values_list('pk', flat=True))
+        reviewed = set(Review.objects.filter(
+            author=author, title_id__in=titles
+        ).values_list('title_id', flat=True))
+        reviews = {}
+        for index, data in valid.items():
+            if data['title_id'] not in titles:
+                results[index] = self.error(
+                    {'title_id': ['Произведение не найдено.']}
+                )
+            elif data['title_id'] in reviewed:
+                results[index] = self.error(
+                    {'non_field_errors': [REVIEW_EXISTS_MESSAGE]}
+                )
+            else:
+                reviewed.add(data['title_id'])
+                reviews[index] = Review(author=author, **data)
+        Review.objects.bulk_create(reviews.values())
+        scores = Counter()
+        counts = Counter()
+        for review in reviews.values():
+            scores[review.title_id] += review.score
+            counts[review.title_id] += 1
+        for title_id, count in counts.items():
+            change_rating(title_id, scores[title_id], count)
+        names = [reviews_version(title_id) for title_id in counts]
+        transaction.on_commit(lambda: data_versions.bump(*names))
+        return reviews
+
+
+class ModerationFeedView(APIView):
+    """
+    Общая лента новых отзывов и комментариев для модерации,
+    от новых к старым, с параметром ?since= (не раньше даты).
+    """
+
+    permission_classes = (IsAdminOrModerator,)
+    feed = (
+        ('review', UserReviewSerializer),
+        ('comment', UserCommentSerializer),
+    )
+
+    def get_querysets(self):
+        reviews = Review.objects.annotate(
+            author_username=F('author__username'),
+            title_name=F('title__name')
+        )
+        comments = Comment.objects.annotate(
+            author_username=F('author__username'),
+            title_id=F('review__title_id'),
+            title_name=F('review__title__name')
+        )
+        since = self.request.query_params.get('since')
+        if since is None:
+            return reviews, comments
+        try:
+            since = serializers.DateTimeField().to_internal_value(since)
+        except ValidationError as error:
+            raise ValidationError({'since': error.detail})
+        return (
+            reviews.filter(pub_date__gte=since),
+            comments.filter(pub_date__gte=since)
+        )
+
+    def get(self, request):
+        paginator = FeedPagination()
+        page = paginator.paginate_querysets(self.get_querysets(), request)
+        return paginator.get_paginated_response([
+            {
+                'type': self.feed[obj.feed_rank][0],
+                **self.feed[obj.feed_rank][1](obj).data
+            }
+            for obj in page
+        ])
+
+
+class ExportView(APIView):
+    """
+    Потоковая выгрузка произведений, отзывов или комментариев в NDJSON
+    для администраторов. С Accept-Encoding: gzip ответ сжимается.
+    """
+
+    permission_classes = (IsAdmin,)
+
+    def get(self, request, name):
+        if name not in EXPORTS:
+            raise NotFound('Неизвестная выгрузка.')
+        chunks = iter_ndjson(name)
+        gzipped = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if gzipped:
+            chunks = iter_gzip(chunks)
+        response = StreamingHttpResponse(
+            chunks, content_type='application/x-ndjson; charset=utf-8'
+        )
+        if gzipped:
+            response['Content-Encoding'] = 'gzip'
+        patch_vary_headers(response, ('Accept-Encoding',))
+        response['Content-Disposition'] = (
+            f'attachment; filename="{name}.ndjson"'
+        )
+        return response
+
+
 class CategoryViewSet(CategoryGenreViewSetBase):
     """ViewSet для категорий."""
 
@@ -155,15 +582,14 @@ class GenreViewSet(CategoryGenreViewSetBase):
     serializer_class = GenreSerializer
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(VersionedReadMixin, SparseFieldsMixin,
+                   viewsets.ModelViewSet):
     """ViewSet для произведений."""
 
     http_method_names = ('get', 'post', 'patch', 'delete', 'head', 'options')
     permission_classes = (IsAdminOrReadOnly,)
     queryset = Title.objects.select_related(
         'category'
-    ).annotate(
-        rating=Avg('reviews__score')
     ).prefetch_related(
         'genre'
     ).order_by(
@@ -173,3 +599,105 @@ class TitleViewSet(viewsets.ModelViewSet):
     serializer_class = TitleSerializer
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
+    keyset_ordering = ('name', 'year', 'id')
+    # Поиск сортирует по релевантности, а не по keyset_ordering.
+    cursor_incompatible_params = ('search',)
+    response_cache = title_cache
+    sparse_fields = {
+        'id': SparseField('id'),
+        'name': SparseField('name'),
+        'year': SparseField('year'),
+        'rating': SparseField('rating'),
+        'review_count': SparseField('review_count'),
+        'description': SparseField('description'),
+        'genre': SparseField(prefetch_related=('genre',)),
+        'category': SparseField(
+            'category', 'category__name', 'category__slug',
+            select_related=('category',)
+        ),
+    }
+
+    def get_queryset(self):
+        return self.prune_queryset(super().get_queryset())
+
+    def get_count_queryset(self):
+        """Произведения с фильтрами запроса, без JOIN и сортировки."""
+        return self.filter_queryset(Title.objects.all())
+
+    def get_version_names(self):
+        if not self.detail:
+            return (LIST_VERSION, CATALOG_VERSION)
+        return (
+            CATALOG_VERSION,
+            title_version(self.kwargs[self.lookup_url_kwarg or 'pk'])
+        )
+
+    @action(detail=False)
+    def top(self, request):
+        """
+        Лучшие произведения по взвешенному рейтингу,
+        в целом или в категории/жанре (?category=, ?genre=).
+        """
+        return self.respond(
+            request,
+            lambda: Response(
+                self.get_serializer(self.get_top_titles(), many=True).data
+            )
+        )
+
+    def get_top_limit(self):
+        limit = self.request.query_params.get('limit', TOP_TITLES_LIMIT)
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            limit = 0
+        if not 0 < limit <= TOP_TITLES_LIMIT:
+            raise ValidationError({
+                'limit': f'Укажите число от 1 до {TOP_TITLES_LIMIT}.'
+            })
+        return limit
+
+    def get_top_titles(self):
+        """
+        Читает не больше limit строк по индексам взвешенного рейтинга:
+        произведений (в т.ч. по категории) или связей с жанром.
+        """
+        limit = self.get_top_limit()
+        genre = self.request.query_params.get('genre')
+        category = self.request.query_params.get('category')
+        queryset = self.get_queryset()
+        if genre is None:
+            queryset = queryset.filter(weighted_rating__isnull=False)
+            if category is not None:
+                queryset = queryset.filter(category__slug=category)
+            return list(queryset.order_by('-weighted_rating', 'id')[:limit])
+        links = GenreTitle.objects.filter(
+            genre__slug=genre, title_rating__isnull=False
+        )
+        if category is not None:
+            links = links.filter(title__category__slug=category)
+        title_ids = list(links.order_by(
+            '-title_rating', 'title_id'
+        ).values_list('title_id', flat=True)[:limit])
+        titles = queryset.in_bulk(title_ids)
+        return [titles[pk] for pk in title_ids if pk in titles]
+
+
+class ThrottleStatsView(APIView):
+    """Счётчики пропущенных и отклонённых запросов этого процесса."""
+
+    permission_classes = (IsAdmin,)
+
+    def get(self, request):
+        return Response(dict(sorted(stats.items())))
+
+
+class CacheStatsView(APIView):
+    """Попадания и промахи кеша ответов этого процесса."""
+
+    permission_classes = (IsAdmin,)
+
+    def get(self, request):
+        return Response({
+            title_cache.prefix: dict(sorted(title_cache.stats.items()))
+        })
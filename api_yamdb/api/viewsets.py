@@ -1,5 +1,7 @@
-from rest_framework import filters, mixins, viewsets
+from rest_framework import filters, mixins, permissions, viewsets
+from rest_framework.exceptions import ValidationError
 
+from api.cache import conditional_response, data_versions
 from api.permissions import IsAdminOrReadOnly
 
 
@@ -15,3 +17,149 @@ class CategoryGenreViewSetBase(
     lookup_field = 'slug'
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
+
+
+class VersionedReadMixin:
+    """
+    Условные GET-запросы (ETag/Last-Modified) для list и retrieve.
+    Вьюсет перечисляет версии данных в get_version_names();
+    если задан response_cache, данные ответа ещё и кешируются.
+    """
+
+    response_cache = None
+
+    def get_version_names(self):
+        raise NotImplementedError
+
+    def respond(self, request, render):
+        versions = data_versions.get(*self.get_version_names())
+        if self.response_cache is None:
+            return conditional_response(request, versions, render)
+        return conditional_response(
+            request,
+            versions,
+            lambda: self.response_cache.fetch(request, versions, render)
+        )
+
+    def list(self, request, *args, **kwargs):
+        return self.respond(
+            request,
+            lambda: super(VersionedReadMixin, self).list(
+                request, *args, **kwargs
+            )
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.respond(
+            request,
+            lambda: super(VersionedReadMixin, self).retrieve(
+                request, *args, **kwargs
+            )
+        )
+
+
+class SparseField:
+    """Что нужно от запроса для вывода поля сериализатора."""
+
+    def __init__(self, *columns, select_related=(), prefetch_related=(),
+                 annotations=None):
+        self.columns = columns
+        self.select_related = select_related
+        self.prefetch_related = prefetch_related
+        self.annotations = annotations or {}
+
+
+class SparseFieldsMixin:
+    """
+    Параметры ?fields= и ?omit= для чтения.
+    Сужают поля сериализатора (через context['fields']) и запрос:
+    лишние JOIN и prefetch убираются, колонки ограничиваются only().
+    Вьюсет описывает поля в sparse_fields: {имя: SparseField(...)}.
+    """
+
+    fields_query_param = 'fields'
+    omit_query_param = 'omit'
+    sparse_fields = {}
+
+    def get_query_field_names(self, param):
+        value = self.request.query_params.get(param)
+        if value is None:
+            return None
+        names = {name.strip() for name in value.split(',') if name.strip()}
+        unknown = names.difference(self.sparse_fields)
+        if unknown:
+            raise ValidationError({
+                param: 'Неизвестные поля: {}.'.format(
+                    ', '.join(sorted(unknown))
+                )
+            })
+        return names
+
+    def get_sparse_fields(self):
+        """Поля для вывода или None, если выборка не запрошена."""
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = None
+            if self.request.method in permissions.SAFE_METHODS:
+                fields = self.get_query_field_names(self.fields_query_param)
+                omit = self.get_query_field_names(self.omit_query_param)
+                if fields is not None or omit is not None:
+                    self._sparse_fields = tuple(
+                        name for name in self.sparse_fields
+                        if (fields is None or name in fields)
+                        and (omit is None or name not in omit)
+                    )
+        return self._sparse_fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_sparse_fields()
+        return context
+
+    def prune_queryset(self, queryset):
+        """
+        Оставляет в запросе только нужное выбранным полям.
+        Аннотации полей добавляются и при полном наборе полей.
+        """
+        fields = self.get_sparse_fields()
+        if fields is None:
+            annotations = {}
+            for field in self.sparse_fields.values():
+                annotations.update(field.annotations)
+            return queryset.annotate(**annotations)
+        columns = {
+            field.lstrip('-')
+            for field in getattr(self, 'keyset_ordering', None) or ()
+        }
+        select_related = set()
+        prefetch_related = set()
+        annotations = {}
+        for name in fields:
+            field = self.sparse_fields[name]
+            columns.update(field.columns)
+            select_related.update(field.select_related)
+            prefetch_related.update(field.prefetch_related)
+            annotations.update(field.annotations)
+        queryset = queryset.select_related(None).prefetch_related(
+            None
+        ).only(*columns).annotate(**annotations)
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        return queryset.prefetch_related(*prefetch_related)
+
+
+class NestedParentMixin:
+    """
+    Вложенный маршрут (отзывы произведения, комментарии отзыва).
+    Вьюсет определяет get_parent(), кеширующий родителя на время
+    запроса; списки фильтруются по id из URL, а существование
+    родителя проверяется, только если страница пуста.
+    """
+
+    def get_parent(self):
+        raise NotImplementedError
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page:
+            self.get_parent()
+        return page
@@ -1,3 +1,4 @@
+import tempfile
 from datetime import timedelta
 from pathlib import Path
 
@@ -67,10 +68,53 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'timeout': 20,
+            'transaction_mode': 'IMMEDIATE',
+        },
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
 
+# Cache
+
+CACHES = {
+    # Тела ответов: ключ включает версии, поэтому кеш может быть свой
+    # у каждого процесса.
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Версии данных и токенов должны быть общими для всех процессов:
+    # по ним сбрасываются кеш ответов и ETag и отзываются права
+    # из токенов (проверка api.E001). Вытесненная версия создаётся
+    # заново, что стоит лишних промахов, поэтому предел записей большой.
+    'versions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': Path(tempfile.gettempdir()) / 'api_yamdb_versions',
+        'OPTIONS': {'MAX_ENTRIES': 1000000},
+    },
+}
+
+# Кеш версий и время жизни версии в секундах: версия, которая долго
+# не менялась, удаляется и при обращении создаётся заново.
+VERSIONS_CACHE = 'versions'
+VERSIONS_TIMEOUT = 30 * 24 * 60 * 60
+
+# Время жизни закешированных ответов API (None - без ограничения).
+RESPONSE_CACHE_TIMEOUT = 60 * 15
+
+# Размер общего для процесса LRU-кеша имён пользователей.
+USERNAME_CACHE_SIZE = 10000
+
+# Кеш пользователей для токенов без актуальных данных:
+# размер и время жизни записи в секундах.
+USER_CACHE_SIZE = 10000
+USER_CACHE_TTL = 60
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -118,12 +162,32 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.KeysetOrPageNumberPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.UserThrottle',
+    ],
+    # Число доверенных прокси перед приложением. При 0 IP клиента -
+    # REMOTE_ADDR, а X-Forwarded-For, который клиент может подделать,
+    # не учитывается; за обратным прокси укажите их количество.
+    'NUM_PROXIES': 0,
+    # Корзины токенов '<scope>.<kind>': ip, username или user.
+    'DEFAULT_THROTTLE_RATES': {
+        'signup.ip': '20/min',
+        'signup.username': '5/hour',
+        'token.ip': '30/min',
+        'token.username': '10/min',
+        'write.user': '120/min',
+    },
 }
 
+# Хранилище корзин ограничения частоты: None - память процесса
+# (не более THROTTLE_STORE_SIZE корзин), иначе имя общего кеша.
+THROTTLE_CACHE = None
+THROTTLE_STORE_SIZE = 100000
+
 AUTH_USER_MODEL = 'reviews.User'
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
@@ -131,3 +195,22 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 DEFAULT_FROM_EMAIL = 'yamdb@ya.ru'
+
+# Очередь писем: отправлять сразу после коммита (без обработчика
+# send_emails), размер пачки, число попыток, начальная задержка
+# повтора в секундах (удваивается с каждой попыткой) и срок, на который
+# обработчик забирает пачку (потом письма вернутся в очередь).
+EMAIL_OUTBOX_EAGER = False
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 60
+EMAIL_OUTBOX_LEASE = 5 * 60
+
+# Срок действия кода подтверждения в секундах и число неудачных
+# попыток ввода, после которого код перестаёт приниматься.
+CONFIRMATION_CODE_TTL = 24 * 60 * 60
+CONFIRMATION_CODE_MAX_ATTEMPTS = 5
+
+# Количество объектов в выдаче, начиная с которого пагинация
+# может отдавать оценку планировщика вместо точного COUNT(*).
+COUNT_ESTIMATE_THRESHOLD = None
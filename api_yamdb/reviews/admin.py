@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin
 
-from .models import Comment, Review, Title
+from .models import Comment, OutgoingEmail, Review, Title
 
 User = get_user_model()
 
@@ -44,6 +44,22 @@ class ReviewAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    """Модель админки для очереди писем."""
+
+    list_display = (
+        'id',
+        'recipient',
+        'subject',
+        'status',
+        'attempts',
+        'next_attempt_at',
+        'sent_at',
+    )
+    list_filter = ('status',)
+
+
 class YamdbUserAdmin(UserAdmin):
     """Модель админки для управления пользователями"""
 
@@ -4,3 +4,10 @@ MIN_COUNT_SCORE = 1
 MAX_COUNT_SCORE = 10
 NAME_MAX_LENGTH = 255
 SLUG_MAX_LENGTH = 50
+# Априорная оценка и её вес в отзывах для взвешенного рейтинга.
+RATING_PRIOR_SCORE = 5.5
+RATING_PRIOR_WEIGHT = 5
+EMAIL_SUBJECT_MAX_LENGTH = 255
+EMAIL_DEDUPE_KEY_MAX_LENGTH = 100
+# Длина хеша кода подтверждения (HMAC-SHA256 в hex).
+CONFIRMATION_HASH_LENGTH = 64
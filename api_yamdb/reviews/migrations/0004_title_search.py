@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from reviews.search import install_title_search, uninstall_title_search
+
+
+def install(apps, schema_editor):
+    install_title_search(schema_editor)
+
+
+def uninstall(apps, schema_editor):
+    uninstall_title_search(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.1 on 2026-10-17 06:27
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Value
+
+from reviews.constants import RATING_PRIOR_SCORE, RATING_PRIOR_WEIGHT
+
+
+def fill_weighted_rating(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    Title.objects.filter(rating_count__gt=0).update(
+        weighted_rating=(
+            Value(RATING_PRIOR_SCORE * RATING_PRIOR_WEIGHT) + F('rating_sum')
+        ) / (Value(RATING_PRIOR_WEIGHT) + F('rating_count'))
+    )
+    GenreTitle.objects.update(title_rating=Subquery(
+        Title.objects.filter(
+            pk=OuterRef('title_id')
+        ).values('weighted_rating')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_genretitle_genre_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='genretitle',
+            name='title_rating',
+            field=models.FloatField(default=None, editable=False, null=True, verbose_name='Взвешенный рейтинг произведения'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='weighted_rating',
+            field=models.FloatField(default=None, editable=False, null=True, verbose_name='Взвешенный рейтинг'),
+        ),
+        migrations.AddIndex(
+            model_name='genretitle',
+            index=models.Index(fields=['genre', '-title_rating', 'title'], name='genretitle_genre_top_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-weighted_rating', 'id'], name='title_top_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', '-weighted_rating', 'id'], name='title_category_top_idx'),
+        ),
+        migrations.RunPython(fill_weighted_rating, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-17 06:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('reviews', '0007_review_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role', 'username', 'email'], name='user_role_username_idx'),
+        ),
+    ]
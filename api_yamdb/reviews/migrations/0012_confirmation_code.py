@@ -0,0 +1,28 @@
+# Generated by Django 5.1.1 on 2026-10-17 07:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConfirmationCode',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='confirmation_code', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('code_hash', models.CharField(max_length=64, verbose_name='Хеш кода')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='Действует до')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Неудачные попытки')),
+            ],
+            options={
+                'verbose_name': 'код подтверждения',
+                'verbose_name_plural': 'Коды подтверждения',
+            },
+        ),
+    ]
@@ -4,11 +4,20 @@ from django.core.validators import (
     MinValueValidator,
 )
 from django.db import models
+from django.db.models import (
+    Case, Count, F, OuterRef, Q, Subquery, Sum, Value, When
+)
+from django.db.models.functions import Coalesce, Lower
 
 from .constants import (
+    CONFIRMATION_HASH_LENGTH,
+    EMAIL_DEDUPE_KEY_MAX_LENGTH,
+    EMAIL_SUBJECT_MAX_LENGTH,
     MAX_COUNT_SCORE,
     MIN_COUNT_SCORE,
     NAME_MAX_LENGTH,
+    RATING_PRIOR_SCORE,
+    RATING_PRIOR_WEIGHT,
     ROLE_MIN_LENGTH,
     SLUG_MAX_LENGTH,
     USERNAME_MAX_LENGTH
@@ -42,6 +51,26 @@ class User(AbstractUser):
 
     class Meta:
         ordering = ('username', 'email')
+        indexes = (
+            models.Index(
+                fields=('role', 'username', 'email'),
+                name='user_role_username_idx'
+            ),
+        )
+        # Имя и почта уникальны без учёта регистра; индексы по
+        # LOWER() используются и для поиска при регистрации.
+        constraints = (
+            models.UniqueConstraint(
+                Lower('username'),
+                name='user_username_ci_unique',
+                violation_error_message='Этот username уже занят.'
+            ),
+            models.UniqueConstraint(
+                Lower('email'),
+                name='user_email_ci_unique',
+                violation_error_message='Эта почта уже занята.'
+            ),
+        )
 
     @property
     def is_admin(self):
@@ -86,6 +115,77 @@ class Genre(CategoryGenreBaseModel):
         verbose_name_plural = 'Жанры'
 
 
+def get_rating_values(rating_sum, review_count, has_reviews):
+    """
+    Выражения для средней оценки и взвешенного рейтинга.
+    Взвешенный (байесовский) рейтинг сглаживает среднюю оценку
+    априорной RATING_PRIOR_SCORE с весом RATING_PRIOR_WEIGHT отзывов.
+    Априорная оценка фиксирована, поэтому рейтинг зависит только
+    от суммы и количества оценок и обновляется вместе с ними.
+    """
+    return {
+        'rating': Case(
+            When(has_reviews, then=rating_sum / review_count),
+            default=None,
+            output_field=models.PositiveSmallIntegerField()
+        ),
+        'weighted_rating': Case(
+            When(
+                has_reviews,
+                then=(
+                    Value(RATING_PRIOR_SCORE * RATING_PRIOR_WEIGHT)
+                    + rating_sum
+                ) / (Value(RATING_PRIOR_WEIGHT) + review_count)
+            ),
+            default=None,
+            output_field=models.FloatField()
+        ),
+    }
+
+
+class TitleQuerySet(models.QuerySet):
+    """Набор запросов произведений."""
+
+    def change_rating(self, score_delta, count_delta):
+        """
+        Атомарно изменяет сумму и количество оценок произведений.
+        Рейтинг пересчитывается в том же UPDATE по старым значениям строки,
+        поэтому параллельные записи не теряют оценки.
+        """
+        new_sum = F('rating_sum') + score_delta
+        new_count = F('review_count') + count_delta
+        updated = self.update(
+            rating_sum=new_sum,
+            review_count=new_count,
+            **get_rating_values(
+                new_sum, new_count, Q(review_count__gt=-count_delta)
+            )
+        )
+        GenreTitle.objects.filter(title__in=self).sync_rating()
+        return updated
+
+    def recalculate_rating(self):
+        """Пересчитывает рейтинг произведений по их отзывам."""
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        self.update(
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score')).values('total')),
+                Value(0)
+            ),
+            review_count=Coalesce(
+                Subquery(reviews.annotate(total=Count('pk')).values('total')),
+                Value(0)
+            )
+        )
+        updated = self.update(**get_rating_values(
+            F('rating_sum'), F('review_count'), Q(review_count__gt=0)
+        ))
+        GenreTitle.objects.filter(title__in=self).sync_rating()
+        return updated
+
+
 class Title(models.Model):
     """Модель произведения."""
 
@@ -105,27 +205,95 @@ class Title(models.Model):
         related_name='titles'
     )
     description = models.TextField(blank=True,)
+    rating_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0,
+        editable=False
+    )
+    review_count = models.PositiveIntegerField(
+        'Количество отзывов',
+        default=0,
+        editable=False
+    )
+    rating = models.PositiveSmallIntegerField(
+        'Рейтинг',
+        null=True,
+        default=None,
+        editable=False
+    )
+    weighted_rating = models.FloatField(
+        'Взвешенный рейтинг',
+        null=True,
+        default=None,
+        editable=False
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         """Мета-класс для произведения."""
         ordering = ('name',)
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = (
+            models.Index(
+                fields=('name', 'year', 'id'),
+                name='title_name_year_id_idx'
+            ),
+            models.Index(
+                fields=('-weighted_rating', 'id'),
+                name='title_top_idx'
+            ),
+            models.Index(
+                fields=('category', '-weighted_rating', 'id'),
+                name='title_category_top_idx'
+            ),
+        )
 
     def __str__(self):
         return self.name
 
 
+class GenreTitleQuerySet(models.QuerySet):
+    """Набор запросов связей жанров и произведений."""
+
+    def sync_rating(self):
+        """Копирует взвешенный рейтинг произведений в связи."""
+        return self.update(title_rating=Subquery(
+            Title.objects.filter(
+                pk=OuterRef('title_id')
+            ).values('weighted_rating')[:1]
+        ))
+
+
 class GenreTitle(models.Model):
     """Связь между произведениями и жанрами."""
 
     title = models.ForeignKey(Title, on_delete=models.CASCADE)
     genre = models.ForeignKey(Genre, on_delete=models.CASCADE)
+    title_rating = models.FloatField(
+        'Взвешенный рейтинг произведения',
+        null=True,
+        default=None,
+        editable=False
+    )
+
+    objects = GenreTitleQuerySet.as_manager()
 
     class Meta:
         """Мета-класс для связи жанров и произведений."""
         verbose_name = 'Связь жанра и произведения'
         verbose_name_plural = 'Связи жанров и произведений'
+        indexes = (
+            models.Index(
+                fields=('genre', 'title'),
+                name='genretitle_genre_title_idx'
+            ),
+            models.Index(
+                fields=('genre', '-title_rating', 'title'),
+                name='genretitle_genre_top_idx'
+            ),
+        )
         constraints = (
             models.UniqueConstraint(
                 fields=('title', 'genre'),
@@ -134,6 +302,24 @@ class GenreTitle(models.Model):
         )
 
 
+class ReviewQuerySet(models.QuerySet):
+    """Набор запросов отзывов."""
+
+    def change_comment_count(self, delta):
+        """Атомарно изменяет количество комментариев отзывов."""
+        return self.update(comment_count=F('comment_count') + delta)
+
+    def recalculate_comment_count(self):
+        """Пересчитывает количество комментариев отзывов."""
+        comments = Comment.objects.filter(
+            review=OuterRef('pk')
+        ).order_by().values('review')
+        return self.update(comment_count=Coalesce(
+            Subquery(comments.annotate(total=Count('pk')).values('total')),
+            Value(0)
+        ))
+
+
 class Review(models.Model):
     """Отзыв к произведению."""
 
@@ -163,11 +349,32 @@ class Review(models.Model):
         )
     )
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False
+    )
+
+    objects = ReviewQuerySet.as_manager()
 
     class Meta:
         ordering = ('-pub_date',)
         verbose_name = 'отзыв'
         verbose_name_plural = 'Отзывы'
+        indexes = (
+            models.Index(
+                fields=('title', '-pub_date', 'id'),
+                name='review_title_pub_date_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date', 'id'),
+                name='review_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=('-pub_date', 'id'),
+                name='review_pub_date_idx'
+            ),
+        )
         constraints = (
             models.UniqueConstraint(
                 fields=('author', 'title'),
@@ -175,6 +382,18 @@ class Review(models.Model):
             ),
         )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает загруженные произведение и оценку отзыва."""
+        instance = super().from_db(db, field_names, values)
+        instance.remember_rating_state()
+        return instance
+
+    def remember_rating_state(self):
+        """Сохраняет текущий вклад отзыва в рейтинг произведения."""
+        if not self.get_deferred_fields().intersection(('title_id', 'score')):
+            self._rating_state = (self.title_id, self.score)
+
     def __str__(self):
         return f'Отзыв от {self.author} на {self.title} - оценка {self.score}'
 
@@ -200,6 +419,98 @@ class Comment(models.Model):
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('review', '-pub_date', 'id'),
+                name='comment_review_pub_date_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date', 'id'),
+                name='comment_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=('-pub_date', 'id'),
+                name='comment_pub_date_idx'
+            ),
+        )
 
     def __str__(self):
         return f'Комментарий от {self.author} к отзыву {self.review.id}'
+
+
+class OutgoingEmail(models.Model):
+    """
+    Письмо в очереди на отправку.
+    Повторные письма с тем же ключом (например, код для одного
+    пользователя) заменяют ещё не отправленное.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        SENT = 'sent', 'Отправлено'
+        FAILED = 'failed', 'Не отправлено'
+
+    dedupe_key = models.CharField(
+        'Ключ',
+        max_length=EMAIL_DEDUPE_KEY_MAX_LENGTH,
+        unique=True
+    )
+    recipient = models.EmailField('Получатель')
+    subject = models.CharField('Тема', max_length=EMAIL_SUBJECT_MAX_LENGTH)
+    body = models.TextField('Текст')
+    status = models.CharField(
+        'Статус',
+        max_length=max(len(value) for value in Status.values),
+        choices=Status.choices,
+        default=Status.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    next_attempt_at = models.DateTimeField('Следующая попытка')
+    created_at = models.DateTimeField('Создано', auto_now_add=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'письмо'
+        verbose_name_plural = 'Очередь писем'
+        ordering = ('next_attempt_at', 'id')
+        indexes = (
+            models.Index(
+                fields=('status', 'next_attempt_at', 'id'),
+                name='email_status_next_attempt_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.subject} для {self.recipient} ({self.status})'
+
+
+class ConfirmationCode(models.Model):
+    """
+    Код подтверждения для получения токена.
+    Хранится только хеш кода, срок действия и число неудачных попыток.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='confirmation_code',
+        verbose_name='Пользователь'
+    )
+    code_hash = models.CharField(
+        'Хеш кода',
+        max_length=CONFIRMATION_HASH_LENGTH
+    )
+    expires_at = models.DateTimeField('Действует до', db_index=True)
+    attempts = models.PositiveSmallIntegerField(
+        'Неудачные попытки',
+        default=0
+    )
+
+    class Meta:
+        verbose_name = 'код подтверждения'
+        verbose_name_plural = 'Коды подтверждения'
+
+    def __str__(self):
+        return f'Код подтверждения для {self.user_id}'
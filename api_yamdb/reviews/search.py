@@ -0,0 +1,139 @@
+"""Полнотекстовый поиск по названию и описанию произведений."""
+from django.db import connections
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'reviews_title_fts'
+MIN_TOKEN_LENGTH = 3
+
+SQLITE_INSTALL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "name, description, content='reviews_title', content_rowid='id', "
+    "tokenize='trigram')",
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+    f'CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON reviews_title BEGIN '
+    f'INSERT INTO {FTS_TABLE}(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    f'CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON reviews_title BEGIN '
+    f'INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) '
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    f'CREATE TRIGGER {FTS_TABLE}_au '
+    'AFTER UPDATE OF name, description ON reviews_title BEGIN '
+    f'INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) '
+    "VALUES ('delete', old.id, old.name, old.description); "
+    f'INSERT INTO {FTS_TABLE}(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+)
+SQLITE_UNINSTALL = (
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+POSTGRESQL_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+POSTGRESQL_INSTALL = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'ALTER TABLE reviews_title ADD COLUMN IF NOT EXISTS search_vector '
+    f'tsvector GENERATED ALWAYS AS ({POSTGRESQL_VECTOR}) STORED',
+    'CREATE INDEX IF NOT EXISTS reviews_title_search_idx '
+    'ON reviews_title USING GIN (search_vector)',
+    'CREATE INDEX IF NOT EXISTS reviews_title_name_trgm_idx '
+    'ON reviews_title USING GIN ((UPPER(name::text)) gin_trgm_ops)',
+)
+POSTGRESQL_UNINSTALL = (
+    'DROP INDEX IF EXISTS reviews_title_name_trgm_idx',
+    'DROP INDEX IF EXISTS reviews_title_search_idx',
+    'ALTER TABLE reviews_title DROP COLUMN IF EXISTS search_vector',
+)
+
+
+def install_title_search(schema_editor):
+    """
+    Создаёт поисковый индекс произведений.
+    На SQLite триггеры теряются при пересоздании таблицы reviews_title,
+    поэтому миграции, меняющие её, должны вызывать функцию повторно.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        statements = SQLITE_INSTALL
+    elif vendor == 'postgresql':
+        statements = POSTGRESQL_INSTALL
+    else:
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def uninstall_title_search(schema_editor):
+    """Удаляет поисковый индекс произведений."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        statements = SQLITE_UNINSTALL
+    elif vendor == 'postgresql':
+        statements = POSTGRESQL_UNINSTALL
+    else:
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def get_match_query(value):
+    """Строка FTS5 MATCH из слов запроса, каждое слово - подстрока."""
+    tokens = [
+        '"{}"'.format(token.replace('"', '""'))
+        for token in value.split()
+        if len(token) >= MIN_TOKEN_LENGTH
+    ]
+    return ' '.join(tokens)
+
+
+def search_titles(queryset, value):
+    """
+    Фильтрует произведения по поисковому запросу и сортирует
+    по релевантности (аннотация search_rank, больше - лучше).
+    """
+    vendor = connections[queryset.db].vendor
+    if vendor == 'sqlite':
+        match = get_match_query(value)
+        if match:
+            return queryset.extra(
+                tables=[FTS_TABLE],
+                where=[
+                    f'{FTS_TABLE}.rowid = reviews_title.id',
+                    f'{FTS_TABLE} MATCH %s',
+                ],
+                params=[match],
+                select={'search_rank': f'-bm25({FTS_TABLE}, 10.0, 1.0)'},
+            ).order_by('-search_rank', 'name', 'year')
+    elif vendor == 'postgresql':
+        query = "websearch_to_tsquery('simple', %s)"
+        return queryset.extra(
+            where=[f'reviews_title.search_vector @@ {query}'],
+            params=[value],
+            select={
+                'search_rank': f'ts_rank(reviews_title.search_vector, {query})'
+            },
+            select_params=[value],
+        ).order_by('-search_rank', 'name', 'year')
+    return (
+        queryset.filter(name__icontains=value)
+        | queryset.filter(description__icontains=value)
+    )
+
+
+def filter_titles_by_name(queryset, value):
+    """Поиск подстроки в названии через поисковый индекс."""
+    if (
+        connections[queryset.db].vendor == 'sqlite'
+        and len(value) >= MIN_TOKEN_LENGTH
+    ):
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            ('name : "{}"'.format(value.replace('"', '""')),)
+        ))
+    return queryset.filter(name__icontains=value)
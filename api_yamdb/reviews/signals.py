@@ -0,0 +1,85 @@
+"""Поддержка денормализованных рейтинга и счётчиков."""
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .models import Comment, GenreTitle, Review, Title
+
+# Отправляется после изменения рейтинга, аргумент title_ids.
+title_rating_changed = Signal()
+
+
+def change_rating(title_id, score_delta, count_delta):
+    """Применяет изменение оценок к произведению и сообщает об этом."""
+    Title.objects.filter(pk=title_id).change_rating(score_delta, count_delta)
+    title_rating_changed.send(sender=Title, title_ids=(title_id,))
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    """Учитывает новую или изменённую оценку в рейтинге произведения."""
+    old_title_id, old_score = getattr(
+        instance, '_rating_state', (None, None)
+    )
+    if created:
+        change_rating(instance.title_id, instance.score, 1)
+    elif old_title_id is None:
+        Title.objects.filter(pk=instance.title_id).recalculate_rating()
+        title_rating_changed.send(
+            sender=Title, title_ids=(instance.title_id,)
+        )
+    elif old_title_id != instance.title_id:
+        change_rating(old_title_id, -old_score, -1)
+        change_rating(instance.title_id, instance.score, 1)
+    elif old_score != instance.score:
+        change_rating(instance.title_id, instance.score - old_score, 0)
+    instance.remember_rating_state()
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, origin=None, **kwargs):
+    """Убирает оценку удалённого отзыва из рейтинга произведения."""
+    if isinstance(origin, Title) or getattr(origin, 'model', None) is Title:
+        return
+    title_id, score = getattr(
+        instance, '_rating_state', (instance.title_id, instance.score)
+    )
+    change_rating(title_id, -score, -1)
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, **kwargs):
+    """Учитывает новый комментарий в счётчике отзыва."""
+    if created:
+        Review.objects.filter(
+            pk=instance.review_id
+        ).change_comment_count(1)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, origin=None, **kwargs):
+    """Убирает удалённый комментарий из счётчика отзыва."""
+    if isinstance(origin, (Review, Title)) or getattr(
+        origin, 'model', None
+    ) in (Review, Title):
+        return
+    Review.objects.filter(pk=instance.review_id).change_comment_count(-1)
+
+
+@receiver(post_save, sender=GenreTitle)
+def sync_genre_title_rating(sender, instance, created, **kwargs):
+    """Новая связь получает текущий рейтинг произведения."""
+    if created:
+        GenreTitle.objects.filter(pk=instance.pk).sync_rating()
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def sync_title_genres_rating(sender, instance, action, reverse, pk_set,
+                             **kwargs):
+    """Связи, созданные через title.genre, минуя save()."""
+    if action != 'post_add' or not pk_set:
+        return
+    if reverse:
+        links = GenreTitle.objects.filter(genre=instance, title__in=pk_set)
+    else:
+        links = GenreTitle.objects.filter(title=instance, genre__in=pk_set)
+    links.sync_rating()
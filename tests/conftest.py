@@ -1,6 +1,9 @@
 import os
 import sys
 
+import pytest
+from django.core.cache import caches
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(BASE_DIR)
 
@@ -29,3 +32,44 @@ if FILENAME not in project_dir_content:
 pytest_plugins = [
     'tests.fixtures.fixture_user',
 ]
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--benchmark', action='store_true',
+        help='Запускать замеры скорости (маркер benchmark).'
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers', 'benchmark: замер скорости, только с --benchmark'
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    # Замеры по времени нестабильны на загруженной машине.
+    if config.getoption('--benchmark'):
+        return
+    skip = pytest.mark.skip(reason='замер скорости: запустите с --benchmark')
+    for item in items:
+        if item.get_closest_marker('benchmark'):
+            item.add_marker(skip)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    for cache in caches.all():
+        cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def eager_email_outbox(settings):
+    settings.EMAIL_OUTBOX_EAGER = True
+
+
+@pytest.fixture(autouse=True)
+def reset_throttling():
+    from api.throttling import local_buckets, stats
+    local_buckets.clear()
+    stats.clear()
@@ -0,0 +1,92 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Title
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_rating(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['rating']
+
+    def test_01_rating_follows_review_changes(self, client, admin_client,
+                                              admin, user_client, user,
+                                              moderator_client, moderator):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        assert self.get_rating(client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения хранится в модели и '
+            'обновляется при создании отзыва.'
+        )
+
+        response = user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            ),
+            data={'score': 8}
+        )
+        assert response.status_code == HTTPStatus.OK
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_sum, title.review_count) == (18, 3), (
+            'Проверьте, что изменение оценки отзыва учитывается в сумме '
+            'оценок произведения.'
+        )
+        assert self.get_rating(client, title_id) == 6
+
+        response = admin_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            )
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(client, title_id) == 5
+
+        response = admin_client.delete(
+            f'/api/v1/users/{moderator.username}/'
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_sum, title.review_count) == (5, 1), (
+            'Проверьте, что при каскадном удалении отзывов рейтинг '
+            'произведения пересчитывается.'
+        )
+
+        admin.delete()
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_sum, title.review_count) == (0, 0)
+        assert self.get_rating(client, title_id) is None, (
+            'Если у произведения не осталось отзывов, '
+            'значением поля `rating` должно быть `None`.'
+        )
+
+    def test_02_rating_recalculation(self, admin_client, admin, user_client,
+                                     user):
+        _, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        Title.objects.filter(pk=title_id).update(
+            rating_sum=0, review_count=0, rating=None
+        )
+        Title.objects.filter(pk=title_id).recalculate_rating()
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_sum, title.review_count, title.rating) == (
+            10, 2, 5
+        )
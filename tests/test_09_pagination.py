@@ -0,0 +1,127 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitlePagination:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def get_count_queries(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        return response.json(), [
+            query['sql'] for query in context.captured_queries
+            if 'COUNT(' in query['sql']
+        ]
+
+    def test_01_count_query_is_stripped(self, client, admin_client):
+        create_titles(admin_client)
+        data, count_queries = self.get_count_queries(client, self.TITLES_URL)
+        assert data['count'] == 2
+        assert len(count_queries) == 1
+        sql = count_queries[0]
+        for table in ('reviews_review', 'reviews_category', 'ORDER BY'):
+            assert table not in sql, (
+                'Проверьте, что количество произведений считается запросом '
+                f'без лишних JOIN и сортировки: найдено `{table}`.'
+            )
+
+    def test_02_count_keeps_filters(self, client, admin_client):
+        _, categories, genres = create_titles(admin_client)
+        data, _ = self.get_count_queries(
+            client, f'{self.TITLES_URL}?category={categories[1]["slug"]}'
+        )
+        assert data['count'] == 1
+        assert len(data['results']) == 1
+
+    def test_03_estimate_threshold(self, client, admin_client, settings):
+        create_titles(admin_client)
+        settings.COUNT_ESTIMATE_THRESHOLD = 1
+        data, count_queries = self.get_count_queries(client, self.TITLES_URL)
+        assert data['count'] == 2, (
+            'Если оценка количества недоступна, пагинация должна '
+            'возвращать точное значение.'
+        )
+        if connection.vendor != 'postgresql':
+            assert len(count_queries) == 1, (
+                'Проверьте, что без оценки планировщика количество '
+                'считается одним запросом.'
+            )
+        settings.COUNT_ESTIMATE_THRESHOLD = 10
+        data, _ = self.get_count_queries(client, self.TITLES_URL)
+        assert data['count'] == 2
+
+    def walk_cursor(self, client, url):
+        results = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert 'count' not in data
+            results.extend(data['results'])
+            url = data['next']
+        return results
+
+    def test_04_titles_cursor(self, client, admin_client):
+        create_titles(admin_client)
+        Title.objects.bulk_create(
+            Title(name='Тёзка', year=2000 + idx % 3) for idx in range(15)
+        )
+        expected = list(
+            Title.objects.order_by('name', 'year', 'id').values_list(
+                'id', flat=True
+            )
+        )
+        results = self.walk_cursor(client, f'{self.TITLES_URL}?cursor=')
+        assert [title['id'] for title in results] == expected, (
+            'Проверьте, что курсорная пагинация произведений обходит все '
+            'объекты в порядке (name, year, id) без пропусков и повторов.'
+        )
+
+    def test_05_reviews_cursor(self, client, admin_client, admin,
+                               django_user_model):
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(pk=titles[0]['id'])
+        users = django_user_model.objects.bulk_create(
+            django_user_model(username=f'user{idx}', email=f'{idx}@ya.ru')
+            for idx in range(23)
+        )
+        Review.objects.bulk_create(
+            Review(title=title, author=user, text='text', score=5)
+            for user in users
+        )
+        Review.objects.filter(author__in=users[:5]).update(
+            pub_date=Review.objects.first().pub_date
+        )
+        expected = list(
+            title.reviews.order_by('-pub_date', 'id').values_list(
+                'id', flat=True
+            )
+        )
+        url = f'/api/v1/titles/{title.id}/reviews/?cursor='
+        results = self.walk_cursor(client, url)
+        assert [review['id'] for review in results] == expected
+
+    def test_06_invalid_cursor(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get(f'{self.TITLES_URL}?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_07_cursor_with_search(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get(f'{self.TITLES_URL}?cursor=&search=Терминатор')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что курсор вместе с `search` отклоняется: '
+            'поиск сортирует по релевантности, а не по ключу курсора.'
+        )
+        response = client.get(f'{self.TITLES_URL}?search=Терминатор')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 1
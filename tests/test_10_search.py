@@ -0,0 +1,58 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Title
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def get_names(self, client, query):
+        response = client.get(f'{self.TITLES_URL}?{query}')
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_by_name_and_description(self, client, admin_client):
+        create_titles(admin_client)
+        assert self.get_names(client, 'search=термин') == ['Терминатор'], (
+            'Проверьте, что параметр `search` ищет произведения по названию '
+            'без учёта регистра.'
+        )
+        assert self.get_names(client, 'search=Yippie') == ['Крепкий орешек'], (
+            'Проверьте, что параметр `search` ищет произведения по описанию.'
+        )
+        assert self.get_names(client, 'search=nothing-like-this') == []
+
+    def test_02_search_relevance(self, client, admin_client):
+        create_titles(admin_client)
+        Title.objects.create(
+            name='Аааа', year=2000, description='Про терминатор немного'
+        )
+        assert self.get_names(client, 'search=терминатор') == [
+            'Терминатор', 'Аааа'
+        ], (
+            'Проверьте, что совпадения в названии ранжируются выше '
+            'совпадений в описании.'
+        )
+
+    def test_03_index_follows_title_writes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = admin_client.patch(
+            f'{self.TITLES_URL}{titles[0]["id"]}/', data={'name': 'Чужой'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_names(client, 'search=Терминатор') == []
+        assert self.get_names(client, 'name=чужо') == ['Чужой']
+        admin_client.delete(f'{self.TITLES_URL}{titles[0]["id"]}/')
+        assert self.get_names(client, 'search=Чужой') == []
+
+    def test_04_name_filter_substring(self, client, admin_client):
+        create_titles(admin_client)
+        assert self.get_names(client, 'name=ерминат') == ['Терминатор']
+        assert self.get_names(client, 'name=ор') == [
+            'Крепкий орешек', 'Терминатор'
+        ]
@@ -0,0 +1,61 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11TitleFilters:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def get_names(self, client, query):
+        response = client.get(f'{self.TITLES_URL}?{query}')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data['count'] == len(data['results'])
+        return [title['name'] for title in data['results']]
+
+    def test_01_genre_exact_match(self, client, admin_client):
+        create_titles(admin_client)
+        assert self.get_names(client, 'genre=horr') == [], (
+            'Проверьте, что фильтр `genre` сравнивает слаг целиком.'
+        )
+        assert self.get_names(client, 'genre=horror') == ['Терминатор']
+
+    def test_02_genre_modes(self, client, admin_client):
+        create_titles(admin_client)
+        assert self.get_names(client, 'genre=horror,drama') == [
+            'Крепкий орешек', 'Терминатор'
+        ], (
+            'Проверьте, что по умолчанию фильтр `genre` возвращает '
+            'произведения с любым из перечисленных жанров.'
+        )
+        assert self.get_names(
+            client, 'genre=horror,comedy&genre_mode=all'
+        ) == ['Терминатор']
+        assert self.get_names(
+            client, 'genre=horror,drama&genre_mode=all'
+        ) == []
+        assert self.get_names(
+            client, 'genre=horror,unknown&genre_mode=all'
+        ) == []
+        assert self.get_names(client, 'genre=horror,comedy') == [
+            'Терминатор'
+        ], 'Произведения с несколькими жанрами не должны дублироваться.'
+
+    def test_03_category_list(self, client, admin_client):
+        create_titles(admin_client)
+        assert self.get_names(client, 'category=film') == []
+        assert self.get_names(client, 'category=films,books') == [
+            'Крепкий орешек', 'Терминатор'
+        ]
+
+    def test_04_genre_resolved_once(self, client, admin_client,
+                                    django_assert_num_queries):
+        create_titles(admin_client)
+        # Жанры, количество, страница и жанры произведений страницы.
+        with django_assert_num_queries(4):
+            names = self.get_names(client, 'genre=horror,unknown')
+        assert names == ['Терминатор']
@@ -0,0 +1,91 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.cache import title_cache
+from reviews.models import Genre
+from tests.utils import (
+    create_single_review,
+    create_titles,
+    run_in_other_process
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12TitleCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    STATS_URL = '/api/v1/cache/stats/'
+
+    def get(self, client, url, expected_cache):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response['X-Cache'] == expected_cache, (
+            f'Ожидался `X-Cache: {expected_cache}` для GET-запроса к `{url}`.'
+        )
+        return response.json()
+
+    def test_01_list_and_detail_cached(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        detail_url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        hits = title_cache.stats['hits']
+        first = self.get(client, self.TITLES_URL, 'MISS')
+        assert self.get(client, self.TITLES_URL, 'HIT') == first
+        self.get(client, f'{self.TITLES_URL}?year=1984', 'MISS')
+        self.get(client, detail_url, 'MISS')
+        self.get(client, detail_url, 'HIT')
+        assert title_cache.stats['hits'] == hits + 2
+
+    def test_02_review_invalidates_only_its_title(self, client, admin_client,
+                                                  user_client):
+        titles, _, _ = create_titles(admin_client)
+        first_url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        second_url = f'{self.TITLES_URL}{titles[1]["id"]}/'
+        self.get(client, self.TITLES_URL, 'MISS')
+        self.get(client, first_url, 'MISS')
+        self.get(client, second_url, 'MISS')
+        create_single_review(user_client, titles[0]['id'], 'text', 7)
+        assert self.get(client, first_url, 'MISS')['rating'] == 7
+        self.get(client, second_url, 'HIT')
+        data = self.get(client, self.TITLES_URL, 'MISS')
+        assert {title['rating'] for title in data['results']} == {7, None}
+
+    def test_03_catalog_changes_invalidate(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        detail_url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        self.get(client, detail_url, 'MISS')
+        Genre.objects.filter(slug='horror').get().delete()
+        data = self.get(client, detail_url, 'MISS')
+        assert [genre['slug'] for genre in data['genre']] == ['comedy']
+        response = admin_client.patch(
+            detail_url, data={'genre': ['drama']}
+        )
+        assert response.status_code == HTTPStatus.OK
+        data = self.get(client, detail_url, 'MISS')
+        assert [genre['slug'] for genre in data['genre']] == ['drama']
+
+    def test_04_stats_endpoint(self, client, admin_client, user_client):
+        create_titles(admin_client)
+        title_cache.stats.clear()
+        self.get(client, self.TITLES_URL, 'MISS')
+        self.get(client, self.TITLES_URL, 'HIT')
+        response = admin_client.get(self.STATS_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {'titles': {'hits': 1, 'misses': 1}}, (
+            f'Проверьте, что `{self.STATS_URL}` отдаёт счётчики '
+            'попаданий и промахов кеша ответов.'
+        )
+        assert user_client.get(self.STATS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+
+    def test_05_write_in_other_process(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        detail_url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        self.get(client, detail_url, 'MISS')
+        self.get(client, detail_url, 'HIT')
+        run_in_other_process(
+            'from api.cache import data_versions, title_version; '
+            f'data_versions.bump(title_version({titles[0]["id"]}))'
+        )
+        self.get(client, detail_url, 'MISS')
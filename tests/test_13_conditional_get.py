@@ -0,0 +1,160 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api import cache
+from api.cache import NS_IN_SECOND, data_versions, reviews_version
+from tests.utils import (
+    create_comments, create_single_review, run_in_other_process
+)
+
+
+class FakeTime:
+
+    def __init__(self, now):
+        self.now = now
+
+    def time_ns(self):
+        return self.now
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ConditionalGet:
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        clock = FakeTime(time.time_ns())
+        monkeypatch.setattr(cache, 'time', clock)
+        return clock
+
+    def check_not_modified(self, client, url):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        etag = response['ETag']
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с совпадающим '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+        assert not context.captured_queries, (
+            'Ответ 304 не должен обращаться к базе данных.'
+        )
+        return etag
+
+    def test_01_not_modified(self, client, admin_client, admin, user_client,
+                             user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        review_id = reviews[0]['id']
+        for url in (
+            f'/api/v1/titles/{title_id}/',
+            '/api/v1/titles/',
+            f'/api/v1/titles/{title_id}/reviews/',
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/',
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+            f'{comments[0]["id"]}/',
+        ):
+            self.check_not_modified(client, url)
+
+    def test_02_validators_change_on_write(self, client, admin_client,
+                                           admin, user_client, user):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        title_id = titles[0]['id']
+        title_url = f'/api/v1/titles/{title_id}/'
+        reviews_url = f'{title_url}reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        title_etag = self.check_not_modified(client, title_url)
+        reviews_etag = self.check_not_modified(client, reviews_url)
+        comments_etag = self.check_not_modified(client, comments_url)
+
+        create_single_review(user_client, title_id, 'text', 1)
+        for url, etag in (
+            (title_url, title_etag), (reviews_url, reviews_etag)
+        ):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что после нового отзыва `{url}` отдаёт '
+                'новые данные.'
+            )
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=comments_etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        reviews_etag = self.check_not_modified(client, reviews_url)
+        admin_client.patch(
+            f'{reviews_url}{reviews[0]["id"]}/', data={'text': 'new'}
+        )
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=reviews_etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение отзыва меняет ETag списка отзывов.'
+        )
+
+    def test_03_last_modified_same_second(self, client, admin_client,
+                                          admin, clock):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        second = clock.now // NS_IN_SECOND * NS_IN_SECOND + 10 * NS_IN_SECOND
+        clock.now = second + NS_IN_SECOND // 10
+        data_versions.bump(reviews_version(titles[0]['id']))
+        clock.now = second + NS_IN_SECOND // 5
+        assert 'Last-Modified' not in client.get(url), (
+            'Проверьте, что `Last-Modified` не отдаётся, пока не прошла '
+            'секунда последнего изменения.'
+        )
+        clock.now = second + NS_IN_SECOND * 3 // 2
+        response = client.get(url)
+        last_modified = response['Last-Modified']
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        data_versions.bump(reviews_version(titles[0]['id']))
+        clock.now = second + NS_IN_SECOND * 8 // 5
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение в ту же секунду, что и прошлый ответ, '
+            'не скрывается ответом 304 по `If-Modified-Since`.'
+        )
+
+    def test_04_username_change(self, client, admin_client, admin):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        etags = {
+            url: self.check_not_modified(client, url)
+            for url in (reviews_url, comments_url)
+        }
+        admin.username = 'renamed'
+        admin.save()
+        for url, etag in etags.items():
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что после смены имени автора `{url}` '
+                'отдаёт новые данные.'
+            )
+            assert response.json()['results'][0]['author'] == 'renamed'
+
+    def test_05_write_in_other_process(self, client, admin_client, admin):
+        _, _, titles = create_comments(admin_client, {admin: admin_client})
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        etag = self.check_not_modified(client, url)
+        run_in_other_process(
+            'from api.cache import data_versions, reviews_version; '
+            f'data_versions.bump(reviews_version({title_id}))'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение в другом процессе меняет ETag: '
+            'версии данных должны храниться в общем кеше.'
+        )
@@ -0,0 +1,67 @@
+import timeit
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from api.serializers import TitleReadSerializer, TitleSerializer
+from reviews.models import Category, Genre, GenreTitle, Title
+
+ROWS = 100
+REPEATS = 5
+
+
+@pytest.mark.django_db
+class Test14TitleListSerializer:
+
+    @pytest.fixture
+    def titles(self):
+        category = Category.objects.create(name='Фильм', slug='films')
+        genres = [
+            Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+            for idx in range(3)
+        ]
+        titles = Title.objects.bulk_create(
+            Title(
+                name=f'Произведение "{idx}"',
+                year=1900 + idx,
+                description='Описание\nс переносом' if idx % 2 else '',
+                category=category if idx % 5 else None,
+                rating=idx % 10 or None,
+            )
+            for idx in range(ROWS)
+        )
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title=title, genre=genre)
+            for title in titles
+            for genre in genres[:titles.index(title) % 4]
+        )
+        return list(
+            Title.objects.select_related('category').prefetch_related(
+                'genre'
+            ).order_by('name', 'year')
+        )
+
+    def test_01_same_output(self, titles):
+        renderer = JSONRenderer()
+        fast = renderer.render(TitleSerializer(titles, many=True).data)
+        slow = renderer.render(TitleReadSerializer(titles, many=True).data)
+        assert fast == slow, (
+            'Быстрая сериализация списка произведений должна давать '
+            'тот же JSON, что и TitleReadSerializer.'
+        )
+
+    @pytest.mark.benchmark
+    def test_02_benchmark(self, titles, record_property):
+        fast = min(timeit.repeat(
+            lambda: TitleSerializer(titles, many=True).data,
+            number=1, repeat=REPEATS
+        ))
+        slow = min(timeit.repeat(
+            lambda: [TitleReadSerializer(title).data for title in titles],
+            number=1, repeat=REPEATS
+        ))
+        record_property('speedup', round(slow / fast, 1))
+        assert fast * 2 < slow, (
+            'Быстрая сериализация должна быть хотя бы вдвое быстрее: '
+            f'{slow / ROWS * 1e6:.1f} -> {fast / ROWS * 1e6:.1f} мкс/строка.'
+        )
@@ -0,0 +1,70 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15SparseFields:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def get(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        return response.json(), [
+            query['sql'] for query in context.captured_queries
+        ]
+
+    def test_01_titles_fields(self, client, admin_client, admin):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        data, queries = self.get(client, f'{self.TITLES_URL}?fields=id,name')
+        assert [set(title) for title in data['results']] == [
+            {'id', 'name'}, {'id', 'name'}
+        ], 'Проверьте, что параметр `fields` ограничивает поля ответа.'
+        sql = ' '.join(queries)
+        for fragment in ('reviews_category', 'reviews_genre', 'description'):
+            assert fragment not in sql, (
+                'Проверьте, что при выборке полей из запроса убираются '
+                f'лишние JOIN, prefetch и колонки: найдено `{fragment}`.'
+            )
+
+        data, queries = self.get(
+            client, f'{self.TITLES_URL}?omit=description,genre'
+        )
+        assert list(data['results'][0]) == [
+            'id', 'name', 'year', 'rating', 'review_count', 'category'
+        ]
+        assert 'reviews_genre' not in ' '.join(queries)
+        assert 'reviews_category' in ' '.join(queries)
+
+        title_id = titles[0]['id']
+        data, _ = self.get(
+            client, f'{self.TITLES_URL}{title_id}/?fields=rating,genre'
+        )
+        assert data == {'rating': 5, 'genre': [
+            {'name': 'Комедия', 'slug': 'comedy'},
+            {'name': 'Ужасы', 'slug': 'horror'},
+        ]}
+
+    def test_02_reviews_fields(self, client, admin_client, admin,
+                               user_client, user):
+        _, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/reviews/'
+        data, queries = self.get(client, f'{url}?fields=id,score')
+        assert [set(review) for review in data['results']] == [
+            {'id', 'score'}, {'id', 'score'}
+        ]
+        assert not any('reviews_user' in sql for sql in queries)
+        assert not any('"text"' in sql for sql in queries)
+
+    def test_03_unknown_field(self, client, admin_client):
+        create_reviews(admin_client, {})
+        response = client.get(f'{self.TITLES_URL}?fields=id,password')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,68 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Category, Genre, GenreTitle, Review, Title
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16TopTitles:
+
+    TOP_URL = '/api/v1/titles/top/'
+
+    def get_names(self, client, query=''):
+        response = client.get(f'{self.TOP_URL}?{query}')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Эндпоинт `{self.TOP_URL}` должен возвращать ответ со '
+            'статусом 200.'
+        )
+        return [title['name'] for title in response.json()]
+
+    def test_01_weighted_ranking(self, client, admin_client, admin, user,
+                                 moderator):
+        titles, _, _ = create_titles(admin_client)
+        lucky = Title.objects.create(name='Один отзыв', year=2000)
+        Review.objects.create(title=lucky, author=admin, text='t', score=10)
+        for author in (admin, user, moderator):
+            Review.objects.create(
+                title_id=titles[0]['id'], author=author, text='t', score=9
+            )
+        Review.objects.create(
+            title_id=titles[1]['id'], author=user, text='t', score=2
+        )
+        Title.objects.create(name='Без отзывов', year=2001)
+        assert self.get_names(client) == [
+            'Терминатор', 'Один отзыв', 'Крепкий орешек'
+        ], (
+            'Проверьте, что лучшие произведения сортируются по '
+            'взвешенному рейтингу, а произведения без отзывов не выводятся.'
+        )
+        assert self.get_names(client, 'limit=1') == ['Терминатор']
+        response = client.get(f'{self.TOP_URL}?limit=1000')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_category_and_genre(self, client, admin_client, user_client):
+        titles, categories, genres = create_titles(admin_client)
+        create_single_review(user_client, titles[1]['id'], 'text', 8)
+        create_single_review(user_client, titles[0]['id'], 'text', 3)
+        assert self.get_names(client, 'category=films') == ['Терминатор']
+        assert self.get_names(client, 'genre=comedy') == ['Терминатор']
+        assert self.get_names(client, 'genre=drama') == ['Крепкий орешек']
+        assert self.get_names(client, 'genre=drama&category=films') == []
+
+        title = Title.objects.get(pk=titles[1]['id'])
+        response = admin_client.patch(
+            f'/api/v1/titles/{title.id}/', data={'genre': ['comedy']}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_names(client, 'genre=comedy') == [
+            'Крепкий орешек', 'Терминатор'
+        ], 'Новые связи с жанром должны получать рейтинг произведения.'
+
+        GenreTitle.objects.create(
+            title=title, genre=Genre.objects.get(slug='horror')
+        )
+        assert self.get_names(client, 'genre=horror')[0] == 'Крепкий орешек'
+        Category.objects.filter(slug='films').delete()
+        assert self.get_names(client, 'category=films') == []
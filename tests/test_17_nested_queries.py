@@ -0,0 +1,83 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17NestedQueries:
+    """Количество SQL-запросов вложенных эндпоинтов."""
+
+    def test_01_reviews(self, client, admin_client, admin, user_client,
+                        user, moderator_client, moderator,
+                        django_assert_num_queries):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+
+        with django_assert_num_queries(2):
+            response = client.get(
+                f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+            )
+        assert response.status_code == HTTPStatus.OK
+        with django_assert_num_queries(2):
+            response = client.get('/api/v1/titles/999/reviews/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+        with django_assert_num_queries(1):
+            response = client.get(f'{url}{reviews[0]["id"]}/')
+        assert response.status_code == HTTPStatus.OK
+
+        with django_assert_num_queries(7):
+            response = moderator_client.post(
+                url, data={'text': 'text', 'score': 5}
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        # Повтор упирается в ограничение: вставка откатывается,
+        # и только тогда проверяется, что отзыв уже есть.
+        with django_assert_num_queries(5):
+            response = moderator_client.post(
+                url, data={'text': 'text', 'score': 5}
+            )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+        with django_assert_num_queries(5):
+            response = user_client.patch(
+                f'{url}{reviews[1]["id"]}/', data={'text': 'new'}
+            )
+        assert response.status_code == HTTPStatus.OK
+
+    def test_02_comments(self, client, admin_client, admin, user_client,
+                         user, django_assert_num_queries):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/'
+        )
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+
+        with django_assert_num_queries(2):
+            response = client.get(
+                f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+                f'{reviews[0]["id"]}/comments/'
+            )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        with django_assert_num_queries(2):
+            response = client.get(
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+                f'{reviews[1]["id"]}/comments/'
+            )
+        assert response.status_code == HTTPStatus.OK
+
+        with django_assert_num_queries(5):
+            response = user_client.post(url, data={'text': 'text'})
+        assert response.status_code == HTTPStatus.CREATED
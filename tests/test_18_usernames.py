@@ -0,0 +1,59 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from api.serializers import ReviewsSerializer
+from api.usernames import usernames
+from reviews.models import Review
+from tests.utils import create_reviews, run_in_other_process
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18AuthorUsernames:
+
+    def test_01_constant_queries(self, client, admin_client, admin,
+                                 user_client, user, moderator_client,
+                                 moderator, django_assert_num_queries):
+        reviews, titles = create_reviews(admin_client, {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        })
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert {review['author'] for review in response.json()['results']} == {
+            admin.username, user.username, moderator.username
+        }
+
+    def test_02_cache_invalidation(self, admin_client, admin, user_client,
+                                   user, django_assert_num_queries):
+        reviews, _ = create_reviews(admin_client, {user: user_client})
+        review = Review.objects.get(pk=reviews[0]['id'])
+        assert ReviewsSerializer(review).data['author'] == user.username
+        with django_assert_num_queries(0):
+            assert usernames.get(user.id) == user.username
+
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'username': 'renamed'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        review = Review.objects.get(pk=reviews[0]['id'])
+        assert ReviewsSerializer(review).data['author'] == 'renamed', (
+            'Проверьте, что кеш имён сбрасывается при смене username.'
+        )
+
+    def test_03_invalidation_in_other_process(self, user):
+        assert usernames.get(user.id) == user.username
+        get_user_model().objects.filter(pk=user.pk).update(
+            username='renamed'
+        )
+        run_in_other_process(
+            'from api.usernames import usernames; usernames.invalidate()'
+        )
+        assert usernames.get(user.id) == 'renamed', (
+            'Проверьте, что сброс кеша имён в другом процессе сбрасывает '
+            'копию в текущем процессе.'
+        )
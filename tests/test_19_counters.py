@@ -0,0 +1,104 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Comment, Review, Title
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Counters:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def get_review(self, client, title_id, review_id):
+        response = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+            + f'{review_id}/'
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json()
+
+    def test_01_counters_follow_writes(self, client, admin_client, admin,
+                                       user_client, user, moderator):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        review_id = reviews[0]['id']
+        response = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert {
+            review['id']: review['comment_count']
+            for review in response.json()['results']
+        } == {reviews[0]['id']: 2, reviews[1]['id']: 0}, (
+            'Проверьте, что отзывы содержат поле `comment_count` '
+            'с количеством комментариев.'
+        )
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.json()['review_count'] == 2, (
+            'Проверьте, что произведение содержит поле `review_count` '
+            'с количеством отзывов.'
+        )
+
+        response = admin_client.delete(
+            self.COMMENTS_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review_id
+            ) + f'{comments[1]["id"]}/'
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_review(client, title_id, review_id)[
+            'comment_count'
+        ] == 1, (
+            'Проверьте, что удаление комментария уменьшает счётчик отзыва.'
+        )
+
+        Comment.objects.create(review_id=review_id, author=moderator, text='t')
+        Comment.objects.create(review_id=review_id, author=user, text='t')
+        user.delete()
+        assert self.get_review(client, title_id, review_id)[
+            'comment_count'
+        ] == 2, (
+            'Проверьте, что каскадное удаление комментариев вместе с '
+            'пользователем уменьшает счётчик отзыва.'
+        )
+        assert Title.objects.get(pk=title_id).review_count == 1
+
+    def test_02_repair_counters(self, admin_client, admin, user_client,
+                                user):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        Review.objects.update(comment_count=7)
+        Title.objects.update(review_count=0, rating_sum=0, rating=None)
+        call_command('repair_counters')
+        assert dict(Review.objects.values_list('id', 'comment_count')) == {
+            reviews[0]['id']: 2, reviews[1]['id']: 0
+        }, (
+            'Проверьте, что команда `repair_counters` пересчитывает '
+            'количество комментариев.'
+        )
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.review_count, title.rating) == (2, 5)
+
+    def test_03_repair_counters_invalidates_cache(self, client, admin_client,
+                                                  admin, user_client, user):
+        _, _, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        Title.objects.update(review_count=0, rating_sum=0, rating=None)
+        assert client.get(url).json()['rating'] is None
+        assert client.get(url)['X-Cache'] == 'HIT'
+        call_command('repair_counters')
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['rating'] == 5, (
+            'Проверьте, что после `repair_counters` кеш ответов '
+            'не отдаёт старый рейтинг.'
+        )
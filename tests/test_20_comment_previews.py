@@ -0,0 +1,84 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Comment
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20CommentPreviews:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_latest_comments(self, client, admin_client, admin,
+                                user_client, user, moderator,
+                                moderator_client, django_assert_num_queries):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        comment = Comment.objects.create(
+            review_id=reviews[1]['id'], author=moderator, text='last'
+        )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        with django_assert_num_queries(3):
+            response = client.get(
+                f'{url}?include=comments&comments_limit=1'
+            )
+        assert response.status_code == HTTPStatus.OK
+        previews = {
+            review['id']: review['comments']
+            for review in response.json()['results']
+        }
+        assert [item['text'] for item in previews[reviews[0]['id']]] == [
+            comments[1]['text']
+        ], (
+            'Проверьте, что с параметром `include=comments` отзыв содержит '
+            'не больше `comments_limit` последних комментариев.'
+        )
+        assert previews[reviews[1]['id']] == [{
+            'id': comment.id,
+            'text': 'last',
+            'author': moderator.username,
+            'pub_date': previews[reviews[1]['id']][0]['pub_date'],
+        }]
+
+        response = moderator_client.patch(
+            f'{url}{reviews[1]["id"]}/comments/{comment.id}/',
+            data={'text': 'edited'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = client.get(f'{url}?include=comments&comments_limit=1')
+        assert {
+            review['id']: review['comments'][0]['text']
+            for review in response.json()['results']
+        }[reviews[1]['id']] == 'edited', (
+            'Проверьте, что изменение комментария сбрасывает кеш '
+            'списка отзывов.'
+        )
+
+        response = client.get(url)
+        assert 'comments' not in response.json()['results'][0], (
+            'Без параметра `include` комментарии в отзывы не вкладываются.'
+        )
+        response = client.get(f'{url}?include=comments&fields=id,comments')
+        assert [
+            set(review) for review in response.json()['results']
+        ] == [{'id', 'comments'}] * 2
+        assert {
+            len(review['comments']) for review in response.json()['results']
+        } == {1, 2}, (
+            'Проверьте, что выборка полей отзыва не затрагивает вложенные '
+            'комментарии.'
+        )
+
+    @pytest.mark.parametrize('query', (
+        'include=authors', 'include=comments&comments_limit=0',
+        'include=comments&comments_limit=100',
+        'include=comments&comments_limit=x',
+    ))
+    def test_02_bad_params(self, client, admin_client, query):
+        response = admin_client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=1) + f'?{query}'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
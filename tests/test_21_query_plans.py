@@ -0,0 +1,101 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments
+
+# Просмотр таблицы целиком, без индекса.
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+# Сортировка во временном B-дереве.
+TEMP_SORT = re.compile(r'TEMP B-TREE')
+# Prefetch (и срез через ROW_NUMBER) сортирует только строки
+# объектов текущей страницы.
+PREFETCH = re.compile(r'_prefetch_related_val_|"qualify_mask"')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21QueryPlans:
+    """Запросы горячих эндпоинтов читают данные по индексам."""
+
+    @pytest.fixture(autouse=True)
+    def tables(self):
+        self.tables = set(connection.introspection.table_names())
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+
+    def is_table_scan(self, step):
+        match = FULL_SCAN.match(step)
+        return bool(match) and match.group(1) in self.tables
+
+    def check_plans(self, client, url, sort=True):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, url
+        for query in context.captured_queries:
+            if not query['sql'].startswith('SELECT'):
+                continue
+            sort_checked = sort and not PREFETCH.search(query['sql'])
+            bad = [
+                step for step in self.explain(query['sql'])
+                if self.is_table_scan(step)
+                or sort_checked and TEMP_SORT.search(step)
+            ]
+            assert not bad, (
+                f'Запрос эндпоинта `{url}` выполняется без подходящего '
+                f'индекса ({"; ".join(bad)}):\n{query["sql"]}'
+            )
+
+    def test_01_hot_paths(self, admin_client, admin, user_client, user):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        review_url = f'{title_url}reviews/{reviews[0]["id"]}/'
+        for url in (
+            '/api/v1/titles/',
+            '/api/v1/titles/?page=1',
+            '/api/v1/titles/top/',
+            '/api/v1/titles/top/?genre=comedy',
+            title_url,
+            f'{title_url}reviews/',
+            f'{title_url}reviews/?page=1',
+            f'{title_url}reviews/?include=comments',
+            review_url,
+            f'{review_url}comments/',
+            f'{review_url}comments/?page=1',
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+            '/api/v1/users/',
+            '/api/v1/users/?role=moderator',
+            '/api/v1/users/me/',
+            '/api/v1/users/me/reviews/',
+            '/api/v1/users/me/comments/',
+            f'/api/v1/users/{user.username}/reviews/',
+            '/api/v1/moderation/feed/',
+        ):
+            self.check_plans(admin_client, url)
+        # Для фильтров по жанру и категории план зависит от их
+        # избирательности: сортировать несколько найденных строк
+        # дешевле, чем обходить индекс сортировки целиком.
+        for url in (
+            '/api/v1/titles/?genre=comedy',
+            '/api/v1/titles/?genre=comedy&genre=drama&genre_mode=all',
+            '/api/v1/titles/?category=movie',
+        ):
+            self.check_plans(admin_client, url, sort=False)
+
+    def test_02_users_by_role(self, admin_client, admin, user, moderator):
+        response = admin_client.get('/api/v1/users/?role=moderator')
+        assert response.status_code == HTTPStatus.OK
+        assert [
+            item['username'] for item in response.json()['results']
+        ] == [moderator.username], (
+            'Проверьте, что список пользователей фильтруется по роли '
+            'через параметр `role`.'
+        )
@@ -0,0 +1,89 @@
+import gzip
+import json
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22Export:
+
+    EXPORT_URL_TEMPLATE = '/api/v1/export/{name}.ndjson'
+
+    def read(self, response):
+        content = b''.join(response.streaming_content)
+        if response.get('Content-Encoding') == 'gzip':
+            content = gzip.decompress(content)
+        return [json.loads(line) for line in content.decode().splitlines()]
+
+    def test_01_export(self, client, admin_client, admin, user_client, user,
+                       django_assert_num_queries):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        response = admin_client.get(
+            self.EXPORT_URL_TEMPLATE.format(name='titles')
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        with django_assert_num_queries(2):
+            rows = self.read(response)
+        assert [row['name'] for row in rows] == [
+            title['name'] for title in titles
+        ], (
+            'Проверьте, что выгрузка произведений содержит все '
+            'произведения по одному на строку.'
+        )
+        assert rows[0]['genre'] == sorted(titles[0]['genre'])
+        assert rows[0]['category'] == titles[0]['category']
+        assert rows[0]['review_count'] == 2
+
+        response = admin_client.get(
+            self.EXPORT_URL_TEMPLATE.format(name='reviews'),
+            HTTP_ACCEPT_ENCODING='gzip'
+        )
+        assert response['Content-Encoding'] == 'gzip', (
+            'Проверьте, что выгрузка сжимается, если клиент '
+            'принимает gzip.'
+        )
+        rows = self.read(response)
+        assert [(row['id'], row['author']) for row in rows] == [
+            (review['id'], review['author']) for review in reviews
+        ]
+
+        response = admin_client.get(
+            self.EXPORT_URL_TEMPLATE.format(name='comments')
+        )
+        rows = self.read(response)
+        assert [(row['id'], row['title_id']) for row in rows] == [
+            (comment['id'], titles[0]['id']) for comment in comments
+        ]
+
+    def test_02_permissions(self, client, user_client, admin_client):
+        url = self.EXPORT_URL_TEMPLATE.format(name='titles')
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN
+        response = admin_client.get(
+            self.EXPORT_URL_TEMPLATE.format(name='users')
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_03_command(self, tmp_path, admin_client, admin, user_client,
+                        user):
+        _, reviews, _ = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        call_command(
+            'export_data', 'reviews', '--gzip', '--chunk-size', '1',
+            '--output-dir', str(tmp_path)
+        )
+        with gzip.open(tmp_path / 'reviews.ndjson.gz', 'rt') as file:
+            rows = [json.loads(line) for line in file]
+        assert [row['id'] for row in rows] == [
+            review['id'] for review in reviews
+        ], (
+            'Проверьте, что команда `export_data` пишет выгрузку в файл.'
+        )
@@ -0,0 +1,86 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Review
+from tests.utils import create_comments, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23UserActivity:
+
+    def test_01_my_reviews(self, admin_client, admin, user_client, user,
+                           django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        reviews = [
+            Review.objects.create(
+                title_id=title['id'], author=user, text='t', score=5
+            )
+            for title in titles
+        ]
+        Review.objects.create(
+            title_id=titles[0]['id'], author=admin, text='t', score=5
+        )
+        with django_assert_num_queries(2):
+            response = user_client.get('/api/v1/users/me/reviews/')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert [item['id'] for item in data['results']] == [
+            review.id for review in reversed(reviews)
+        ], (
+            'Проверьте, что `/api/v1/users/me/reviews/` возвращает отзывы '
+            'текущего пользователя от новых к старым.'
+        )
+        assert data['results'][0]['title'] == {
+            'id': titles[-1]['id'], 'name': titles[-1]['name']
+        }
+        assert data['results'][0]['author'] == user.username
+        assert data['next'] is None
+
+    def test_02_my_comments(self, client, admin_client, admin, user_client,
+                            user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        response = user_client.get('/api/v1/users/me/comments/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'] == [{
+            'id': comments[1]['id'],
+            'text': comments[1]['text'],
+            'author': user.username,
+            'pub_date': response.json()['results'][0]['pub_date'],
+            'review': reviews[0]['id'],
+            'title': {'id': titles[0]['id'], 'name': titles[0]['name']},
+        }], (
+            'Проверьте, что `/api/v1/users/me/comments/` возвращает '
+            'комментарии текущего пользователя с отзывом и произведением.'
+        )
+        response = client.get('/api/v1/users/me/comments/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_03_user_reviews(self, admin_client, admin, user_client, user,
+                             moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        for title in titles:
+            Review.objects.create(
+                title_id=title['id'], author=user, text='t', score=5
+            )
+        url = f'/api/v1/users/{user.username}/reviews/'
+        assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN
+        seen = []
+        next_url = url
+        while next_url:
+            response = moderator_client.get(next_url)
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что модератор и администратор видят отзывы '
+                'пользователя по адресу `/api/v1/users/{username}/reviews/`.'
+            )
+            seen.extend(item['id'] for item in response.json()['results'])
+            next_url = response.json()['next']
+        assert sorted(seen) == sorted(
+            Review.objects.filter(author=user).values_list('id', flat=True)
+        )
+        response = admin_client.get(f'/api/v1/users/{admin.username}/reviews/')
+        assert response.json() == {'next': None, 'results': []}
+        response = admin_client.get('/api/v1/users/nobody/reviews/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
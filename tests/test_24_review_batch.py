@@ -0,0 +1,109 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import IntegrityError
+
+from reviews.models import Review, Title
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24ReviewBatch:
+
+    BATCH_URL = '/api/v1/reviews/batch/'
+
+    def test_01_batch(self, admin_client, user_client, user,
+                      django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        titles.append({'id': Title.objects.create(name='c', year=2000).id})
+        Review.objects.create(
+            title_id=titles[1]['id'], author=user, text='old', score=4
+        )
+        data = [
+            {'title_id': titles[0]['id'], 'text': 'a', 'score': 6},
+            {'title_id': titles[1]['id'], 'text': 'b', 'score': 7},
+            {'title_id': 999, 'text': 'c', 'score': 7},
+            {'title_id': titles[0]['id'], 'text': 'd', 'score': 8},
+            {'title_id': titles[2]['id'], 'text': 'e', 'score': 11},
+            {'title_id': titles[2]['id'], 'text': 'f', 'score': 10},
+        ]
+        with django_assert_num_queries(10):
+            response = user_client.post(
+                self.BATCH_URL, data=data, format='json'
+            )
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()['results']
+        assert [item['status'] for item in results] == [
+            201, 400, 400, 400, 400, 201
+        ], (
+            'Проверьте, что пакетная отправка возвращает результат для '
+            'каждого отзыва в исходном порядке.'
+        )
+        assert results[0]['review']['text'] == 'a'
+        assert results[0]['review']['author'] == user.username
+        assert results[1]['errors'] == {'non_field_errors': [
+            'Вы уже оставляли отзыв на это произведение.'
+        ]}
+        assert 'title_id' in results[2]['errors']
+        assert 'score' in results[4]['errors']
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.review_count, title.rating) == (
+            6, 1, 6
+        ), (
+            'Проверьте, что пакетная отправка обновляет рейтинг '
+            'произведений.'
+        )
+        response = user_client.get(
+            f'/api/v1/titles/{titles[2]["id"]}/reviews/'
+        )
+        assert [item['text'] for item in response.json()['results']] == [
+            'f'
+        ]
+
+    def test_02_bad_requests(self, client, user_client):
+        assert client.post(
+            self.BATCH_URL, data=[], content_type='application/json'
+        ).status_code == HTTPStatus.UNAUTHORIZED
+        for data in ([], {'title_id': 1}, [{}] * 501):
+            response = user_client.post(
+                self.BATCH_URL, data=data, format='json'
+            )
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_concurrent_conflicts(self, admin_client, user_client,
+                                     monkeypatch):
+        titles, _, _ = create_titles(admin_client)
+        bulk_create = Review.objects.bulk_create
+        conflicts = []
+
+        def conflicting_bulk_create(objs, *args, **kwargs):
+            if conflicts:
+                conflicts.pop()
+                raise IntegrityError('UNIQUE constraint failed')
+            return bulk_create(objs, *args, **kwargs)
+
+        monkeypatch.setattr(
+            Review.objects, 'bulk_create', conflicting_bulk_create
+        )
+        data = [
+            {'title_id': titles[0]['id'], 'text': 'a', 'score': 6},
+            {'title_id': titles[1]['id'], 'text': 'b', 'score': 11},
+        ]
+        conflicts.extend([True] * 2)
+        response = user_client.post(self.BATCH_URL, data=data, format='json')
+        assert [item['status'] for item in response.json()['results']] == [
+            201, 400
+        ], 'Проверьте, что пакет повторяется после конфликта вставки.'
+
+        data[0]['title_id'] = titles[1]['id']
+        conflicts.extend([True] * 3)
+        response = user_client.post(self.BATCH_URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.OK
+        assert [item['status'] for item in response.json()['results']] == [
+            409, 400
+        ], (
+            'Проверьте, что после исчерпания попыток пакет отвечает 409 '
+            'для корректных отзывов, а не ошибкой сервера.'
+        )
+        assert Review.objects.filter(title_id=titles[1]['id']).count() == 0
@@ -0,0 +1,105 @@
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import pytest
+from django.db import connections
+from rest_framework.test import APIClient
+
+from api.views import ReviewsViewSet
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25ConcurrentReviews:
+
+    REQUESTS = 16
+
+    def test_01_double_submit(self, token_user, user):
+        title = Title.objects.create(name='Произведение', year=2000)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+
+        def post(_):
+            client = APIClient()
+            client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {token_user["access"]}'
+            )
+            try:
+                return client.post(url, data={'text': 't', 'score': 5})
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            responses = list(executor.map(post, range(self.REQUESTS)))
+        statuses = sorted(response.status_code for response in responses)
+        assert statuses == [HTTPStatus.CREATED] + [
+            HTTPStatus.BAD_REQUEST
+        ] * (self.REQUESTS - 1), (
+            'Проверьте, что при параллельной отправке одного отзыва '
+            'создаётся один отзыв, а остальные запросы получают ответ 400.'
+        )
+        assert {
+            tuple(response.json().get('non_field_errors', ()))
+            for response in responses
+            if response.status_code == HTTPStatus.BAD_REQUEST
+        } == {('Вы уже оставляли отзыв на это произведение.',)}
+        assert Review.objects.filter(title=title).count() == 1
+        title.refresh_from_db()
+        assert (title.rating_sum, title.review_count) == (5, 1)
+
+    def test_02_concurrent_updates(self, token_user, user):
+        title = Title.objects.create(name='Произведение', year=2000)
+        review = Review.objects.create(
+            title=title, author=user, text='t', score=5
+        )
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/'
+
+        def patch(score):
+            client = APIClient()
+            client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {token_user["access"]}'
+            )
+            try:
+                return client.patch(url, data={'score': score})
+            finally:
+                connections.close_all()
+
+        scores = [score % 10 + 1 for score in range(self.REQUESTS)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            responses = list(executor.map(patch, scores))
+        assert {response.status_code for response in responses} == {
+            HTTPStatus.OK
+        }
+        review.refresh_from_db()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.review_count) == (review.score, 1), (
+            'Проверьте, что параллельные изменения оценки одного отзыва '
+            'не сдвигают сумму оценок произведения.'
+        )
+
+    def test_03_delete_after_concurrent_update(self, user, user_client,
+                                               monkeypatch):
+        title = Title.objects.create(name='Произведение', year=2000)
+        review = Review.objects.create(
+            title=title, author=user, text='t', score=5
+        )
+        get_object = ReviewsViewSet.get_object
+
+        def get_stale_object(view):
+            stale = get_object(view)
+            # Параллельный запрос меняет оценку после загрузки отзыва.
+            fresh = Review.objects.get(pk=stale.pk)
+            fresh.score = 9
+            fresh.save()
+            return stale
+
+        monkeypatch.setattr(ReviewsViewSet, 'get_object', get_stale_object)
+        response = user_client.delete(
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/'
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        title.refresh_from_db()
+        assert (title.rating_sum, title.review_count) == (0, 0), (
+            'Проверьте, что при удалении отзыва вычитается оценка, '
+            'прочитанная под блокировкой, а не загруженная до '
+            'параллельной правки.'
+        )
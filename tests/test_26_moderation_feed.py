@@ -0,0 +1,86 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+from reviews.models import Comment, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26ModerationFeed:
+
+    FEED_URL = '/api/v1/moderation/feed/'
+
+    def create_activity(self, admin, user, moderator):
+        now = timezone.now()
+        titles = [
+            Title.objects.create(name=f'Произведение {idx}', year=2000)
+            for idx in range(4)
+        ]
+        expected = []
+        for idx, title in enumerate(titles):
+            for author in (admin, user, moderator):
+                review = Review.objects.create(
+                    title=title, author=author, text='r', score=5
+                )
+                comment = Comment.objects.create(
+                    review=review, author=author, text='c'
+                )
+                pub_date = now - timedelta(minutes=idx)
+                Review.objects.filter(pk=review.pk).update(pub_date=pub_date)
+                Comment.objects.filter(pk=comment.pk).update(
+                    pub_date=pub_date
+                )
+                expected.append((pub_date, 0, review.id, 'review'))
+                expected.append((pub_date, 1, comment.id, 'comment'))
+        expected.sort(key=lambda item: (-item[0].timestamp(), *item[1:3]))
+        return [(kind, pk) for _, _, pk, kind in expected], titles
+
+    def test_01_feed(self, moderator_client, admin, user, moderator,
+                     django_assert_num_queries):
+        expected, titles = self.create_activity(admin, user, moderator)
+        with django_assert_num_queries(3):
+            response = moderator_client.get(self.FEED_URL)
+        assert response.status_code == HTTPStatus.OK
+        first = response.json()['results'][0]
+        assert first['type'] == 'review'
+        assert first['title'] == {'id': titles[0].id, 'name': titles[0].name}
+        seen = []
+        next_url = self.FEED_URL
+        while next_url:
+            data = moderator_client.get(next_url).json()
+            seen.extend((item['type'], item['id']) for item in data['results'])
+            next_url = data['next']
+        assert seen == expected, (
+            'Проверьте, что лента модерации выдаёт все отзывы и комментарии '
+            'от новых к старым без пропусков и повторов, в том числе для '
+            'записей с одинаковым временем публикации.'
+        )
+        comment = next(
+            item for item in data['results'] if item['type'] == 'comment'
+        )
+        assert comment['review'] == Comment.objects.get(
+            pk=comment['id']
+        ).review_id
+
+    def test_02_since(self, admin_client, admin, user, moderator):
+        expected, _ = self.create_activity(admin, user, moderator)
+        since = (timezone.now() - timedelta(seconds=30)).isoformat()
+        response = admin_client.get(self.FEED_URL, {'since': since})
+        assert [
+            (item['type'], item['id']) for item in response.json()['results']
+        ] == expected[:6], (
+            'Проверьте, что параметр `since` оставляет в ленте только '
+            'записи не старше указанной даты.'
+        )
+        response = admin_client.get(self.FEED_URL, {'since': 'вчера'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_permissions(self, client, user_client):
+        assert client.get(self.FEED_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+        assert user_client.get(self.FEED_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        )
@@ -0,0 +1,142 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.checks import run_checks
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import VERSION_CLAIM, get_access_token
+from api.cache import token_version, token_versions
+from api.confirmation import issue_confirmation_code
+from tests.utils import run_in_other_process
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27ClaimsAuth:
+
+    TOKEN_URL = '/api/v1/auth/token/'
+    CATEGORIES_URL = '/api/v1/categories/'
+
+    def get_client(self, user):
+        response = APIClient().post(self.TOKEN_URL, data={
+            'username': user.username,
+            'confirmation_code': issue_confirmation_code(user),
+        })
+        assert response.status_code == HTTPStatus.OK
+        token = response.json()['token']
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client, AccessToken(token)
+
+    def user_queries(self, context):
+        return [
+            query['sql'] for query in context.captured_queries
+            if 'FROM "reviews_user"' in query['sql']
+        ]
+
+    def test_01_claims(self, admin, user):
+        client, token = self.get_client(admin)
+        assert (token['username'], token['role']) == (
+            admin.username, admin.role
+        ), (
+            'Проверьте, что токен содержит имя и роль пользователя.'
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(
+                self.CATEGORIES_URL, data={'name': 'Кино', 'slug': 'movie'}
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        assert not self.user_queries(context), (
+            'Проверьте, что для токена с данными пользователя '
+            'не выполняется запрос к таблице пользователей.'
+        )
+        client, _ = self.get_client(user)
+        response = client.post(
+            self.CATEGORIES_URL, data={'name': 'Книги', 'slug': 'books'}
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+    def test_02_role_change(self, admin_client, user):
+        client, _ = self.get_client(user)
+        data = {'name': 'Кино', 'slug': 'movie'}
+        assert client.post(
+            self.CATEGORIES_URL, data=data
+        ).status_code == HTTPStatus.FORBIDDEN
+
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.CATEGORIES_URL, data=data)
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что смена роли через `/api/v1/users/{username}/` '
+            'сразу действует для ранее выданных токенов.'
+        )
+        assert len(self.user_queries(context)) == 1
+        with CaptureQueriesContext(connection) as context:
+            client.get('/api/v1/users/me/reviews/')
+        assert not self.user_queries(context), (
+            'Проверьте, что пользователь для устаревшего токена '
+            'берётся из кеша.'
+        )
+
+        user.is_active = False
+        user.save()
+        assert client.get(
+            '/api/v1/users/me/'
+        ).status_code == HTTPStatus.UNAUTHORIZED
+        user.delete()
+        assert client.get(
+            '/api/v1/users/me/'
+        ).status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_03_shared_versions(self, user):
+        client, _ = self.get_client(user)
+        # Смена роли в другом процессе, например в другом воркере.
+        run_in_other_process(
+            'from api.cache import token_version, token_versions; '
+            f'token_versions.bump(token_version({user.pk}))'
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.CATEGORIES_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert len(self.user_queries(context)) == 1, (
+            'Проверьте, что версии токенов хранятся в кеше, общем '
+            'для всех процессов.'
+        )
+
+    def test_04_process_local_cache_check(self, settings):
+        assert not [
+            error for error in run_checks() if error.id.startswith('api.')
+        ]
+        settings.CACHES = {
+            **settings.CACHES,
+            'versions': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'
+            },
+        }
+        assert 'api.E001' in [error.id for error in run_checks()], (
+            'Проверьте, что кеш версий токенов в памяти процесса '
+            'считается ошибкой настройки.'
+        )
+
+    def test_05_versions_not_evicted(self, django_user_model):
+        users = django_user_model.objects.bulk_create(
+            django_user_model(
+                username=f'user-{number}', email=f'user-{number}@yamdb.fake'
+            )
+            for number in range(400)
+        )
+        issued = {
+            user.pk: get_access_token(user)[VERSION_CLAIM] for user in users
+        }
+        current = dict(zip(issued, token_versions.get(
+            *(token_version(pk) for pk in issued)
+        )))
+        assert current == issued, (
+            'Проверьте, что версии токенов не вытесняются из кеша, '
+            'когда пользователей больше, чем его предел по умолчанию.'
+        )
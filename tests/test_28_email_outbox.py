@@ -0,0 +1,147 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from api import outbox
+from reviews.models import OutgoingEmail
+
+
+class FailingBackend:
+
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+class CheckingBackend:
+
+    def __init__(self):
+        self.in_transaction = []
+
+    def send_messages(self, messages):
+        self.in_transaction.append(connection.in_atomic_block)
+        return len(messages)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28EmailOutbox:
+
+    SIGNUP_URL = '/api/v1/auth/signup/'
+
+    @pytest.fixture(autouse=True)
+    def lazy_outbox(self, settings):
+        settings.EMAIL_OUTBOX_EAGER = False
+        outbox.stats.clear()
+
+    def signup(self, client, username='new-user'):
+        response = client.post(self.SIGNUP_URL, data={
+            'username': username, 'email': f'{username}@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.OK
+        return response
+
+    def test_01_signup_enqueues(self, client):
+        self.signup(client)
+        self.signup(client)
+        assert not mail.outbox, (
+            'Проверьте, что письмо при регистрации не отправляется '
+            'в обработчике запроса.'
+        )
+        email = OutgoingEmail.objects.get()
+        assert (email.recipient, email.status) == (
+            'new-user@yamdb.fake', OutgoingEmail.Status.PENDING
+        ), (
+            'Проверьте, что повторный запрос кода заменяет письмо в очереди, '
+            'а не добавляет новое.'
+        )
+        assert outbox.get_queue_depth() == 1
+
+    def test_02_send_batch(self, client):
+        for number in range(3):
+            self.signup(client, f'user-{number}')
+        assert outbox.send_batch(batch_size=2) == 2
+        assert len(mail.outbox) == 2
+        assert outbox.send_batch() == 1
+        assert outbox.send_batch() == 0
+        assert sorted(message.to[0] for message in mail.outbox) == [
+            f'user-{number}@yamdb.fake' for number in range(3)
+        ]
+        assert not OutgoingEmail.objects.exclude(
+            status=OutgoingEmail.Status.SENT
+        ).exists()
+        assert (outbox.stats['sent'], outbox.stats['attempted']) == (3, 3)
+
+    def test_03_retry(self, client, settings):
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        self.signup(client)
+        assert outbox.send_batch(connection=FailingBackend()) == 0
+        email = OutgoingEmail.objects.get()
+        assert (email.status, email.attempts) == (
+            OutgoingEmail.Status.PENDING, 1
+        )
+        assert 'SMTP недоступен' in email.last_error
+        assert email.next_attempt_at > timezone.now() + timedelta(
+            seconds=settings.EMAIL_OUTBOX_RETRY_DELAY - 5
+        ), (
+            'Проверьте, что после ошибки письмо откладывается.'
+        )
+        assert outbox.send_batch() == 0, (
+            'Проверьте, что отложенное письмо не отправляется раньше срока.'
+        )
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        assert outbox.send_batch(connection=FailingBackend()) == 0
+        email.refresh_from_db()
+        assert (email.status, email.attempts) == (
+            OutgoingEmail.Status.FAILED, 2
+        ), (
+            'Проверьте, что после последней попытки письмо снимается '
+            'с отправки.'
+        )
+        assert (outbox.stats['failed'], outbox.stats['dropped']) == (2, 1)
+
+    def test_04_no_transaction_while_sending(self, client, settings):
+        self.signup(client)
+        self.signup(client, 'other-user')
+        backend = CheckingBackend()
+        assert outbox.send_batch(connection=backend) == 2
+        assert backend.in_transaction == [False, False], (
+            'Проверьте, что письма отправляются вне транзакции '
+            'и не держат блокировку базы.'
+        )
+        assert not OutgoingEmail.objects.exclude(
+            status=OutgoingEmail.Status.SENT
+        ).exists()
+
+    def test_05_lease(self, client):
+        self.signup(client)
+        emails, lease = outbox.claim_emails(OutgoingEmail.objects.all())
+        assert len(emails) == 1
+        assert outbox.send_batch() == 0, (
+            'Проверьте, что взятое обработчиком письмо не отправляется '
+            'другим обработчиком.'
+        )
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        assert outbox.send_batch() == 1, (
+            'Проверьте, что письмо упавшего обработчика возвращается '
+            'в очередь.'
+        )
+        assert outbox.send_emails(OutgoingEmail.objects.all()) == 0
+
+    def test_06_command(self, client, capsys):
+        self.signup(client)
+        call_command('send_emails', '--once')
+        assert len(mail.outbox) == 1
+        assert 'Отправлено: 1' in capsys.readouterr().out
+        assert outbox.get_queue_depth() == 0
+
+    def test_07_eager(self, client, settings):
+        settings.EMAIL_OUTBOX_EAGER = True
+        self.signup(client)
+        assert len(mail.outbox) == 1
+        assert OutgoingEmail.objects.get().status == (
+            OutgoingEmail.Status.SENT
+        )
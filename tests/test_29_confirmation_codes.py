@@ -0,0 +1,112 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from api.confirmation import check_confirmation_code, issue_confirmation_code
+from reviews.models import ConfirmationCode
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29ConfirmationCodes:
+
+    SIGNUP_URL = '/api/v1/auth/signup/'
+    TOKEN_URL = '/api/v1/auth/token/'
+
+    def get_token(self, client, user, code):
+        return client.post(self.TOKEN_URL, data={
+            'username': user.username, 'confirmation_code': code
+        })
+
+    def test_01_code_from_email(self, client, django_user_model):
+        response = client.post(self.SIGNUP_URL, data={
+            'username': 'new-user', 'email': 'new-user@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.OK
+        user = django_user_model.objects.get(username='new-user')
+        code = mail.outbox[0].body.split('Ваш код подтверждения: ')[1]
+        code = code.split()[0]
+        stored = ConfirmationCode.objects.get(user=user)
+        assert code not in stored.code_hash, (
+            'Проверьте, что код подтверждения не хранится в открытом виде.'
+        )
+        response = self.get_token(client, user, code)
+        assert response.status_code == HTTPStatus.OK
+        assert 'token' in response.json()
+        response = self.get_token(client, user, code)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что код подтверждения одноразовый.'
+        )
+
+    def test_02_token_queries(self, client, user, django_assert_num_queries):
+        code = issue_confirmation_code(user)
+        with django_assert_num_queries(2):
+            response = self.get_token(client, user, code)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что выдача токена стоит одного чтения и одной '
+            'записи.'
+        )
+        code = issue_confirmation_code(user)
+        with django_assert_num_queries(2):
+            response = self.get_token(client, user, 'wrong-code')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_attempts(self, client, user, settings):
+        settings.CONFIRMATION_CODE_MAX_ATTEMPTS = 3
+        code = issue_confirmation_code(user)
+        for _ in range(settings.CONFIRMATION_CODE_MAX_ATTEMPTS):
+            response = self.get_token(client, user, 'wrong-code')
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert ConfirmationCode.objects.get(user=user).attempts == 3
+        response = self.get_token(client, user, code)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что после исчерпания попыток код не принимается.'
+        )
+        code = issue_confirmation_code(user)
+        assert self.get_token(client, user, code).status_code == (
+            HTTPStatus.OK
+        ), (
+            'Проверьте, что новый код сбрасывает счётчик попыток.'
+        )
+
+    def test_04_concurrent_attempts(self, user, settings,
+                                    django_user_model):
+        settings.CONFIRMATION_CODE_MAX_ATTEMPTS = 3
+        code = issue_confirmation_code(user)
+        # Каждый запрос загрузил код до того, как другие его изменили.
+        loaded = [
+            django_user_model.objects.select_related(
+                'confirmation_code'
+            ).get(pk=user.pk)
+            for _ in range(5)
+        ]
+        for stale in loaded[:4]:
+            assert not check_confirmation_code(stale, 'wrong-code')
+        assert ConfirmationCode.objects.get(user=user).attempts == 3, (
+            'Проверьте, что параллельные попытки не увеличивают счётчик '
+            'сверх лимита.'
+        )
+        assert not check_confirmation_code(loaded[4], code), (
+            'Проверьте, что после исчерпания попыток код не принимается '
+            'и запросом, загрузившим его раньше.'
+        )
+
+    def test_05_expiry(self, client, user, admin):
+        code = issue_confirmation_code(user)
+        issue_confirmation_code(admin)
+        ConfirmationCode.objects.filter(user=user).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        response = self.get_token(client, user, code)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что просроченный код не принимается.'
+        )
+        call_command('purge_confirmation_codes')
+        assert list(
+            ConfirmationCode.objects.values_list('user', flat=True)
+        ) == [admin.pk], (
+            'Проверьте, что команда удаляет только просроченные коды.'
+        )
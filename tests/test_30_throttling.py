@@ -0,0 +1,141 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.throttling import LocalBuckets, stats
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30Throttling:
+
+    SIGNUP_URL = '/api/v1/auth/signup/'
+    TOKEN_URL = '/api/v1/auth/token/'
+    CATEGORIES_URL = '/api/v1/categories/'
+    STATS_URL = '/api/v1/throttling/stats/'
+
+    @pytest.fixture
+    def rates(self, settings):
+        def set_rates(**rates):
+            settings.REST_FRAMEWORK = {
+                **settings.REST_FRAMEWORK,
+                'DEFAULT_THROTTLE_RATES': {
+                    key.replace('_', '.'): rate
+                    for key, rate in rates.items()
+                },
+            }
+        return set_rates
+
+    def test_01_signup_ip(self, client, rates):
+        rates(signup_ip='2/min')
+        for number in range(2):
+            response = client.post(self.SIGNUP_URL, data={
+                'username': f'user-{number}',
+                'email': f'user-{number}@yamdb.fake'
+            })
+            assert response.status_code == HTTPStatus.OK
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.SIGNUP_URL, data={
+                'username': 'user-3', 'email': 'user-3@yamdb.fake'
+            })
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что регистрация ограничена по IP-адресу.'
+        )
+        assert 'Retry-After' in response
+        assert not context.captured_queries, (
+            'Проверьте, что отклонённый запрос не обращается к базе данных.'
+        )
+        response = client.post(
+            self.SIGNUP_URL,
+            data={'username': 'user-3', 'email': 'user-3@yamdb.fake'},
+            REMOTE_ADDR='10.0.0.1'
+        )
+        assert response.status_code == HTTPStatus.OK
+
+    def test_02_forwarded_for_spoofing(self, client, rates):
+        rates(signup_ip='1/min')
+        statuses = [
+            client.post(
+                self.SIGNUP_URL,
+                data={
+                    'username': f'user-{number}',
+                    'email': f'user-{number}@yamdb.fake'
+                },
+                HTTP_X_FORWARDED_FOR=f'10.0.0.{number}'
+            ).status_code
+            for number in range(3)
+        ]
+        assert statuses == [HTTPStatus.OK] + [
+            HTTPStatus.TOO_MANY_REQUESTS
+        ] * 2, (
+            'Проверьте, что подменой `X-Forwarded-For` нельзя обойти '
+            'ограничение по IP-адресу.'
+        )
+
+    def test_03_token_username(self, client, user, rates):
+        rates(token_username='2/min')
+        data = {'username': user.username, 'confirmation_code': 'wrong'}
+        for _ in range(2):
+            response = client.post(self.TOKEN_URL, data=data)
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.post(
+            self.TOKEN_URL,
+            data={**data, 'username': user.username.upper()},
+            REMOTE_ADDR='10.0.0.1'
+        )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что выдача токена ограничена по username '
+            'независимо от IP-адреса.'
+        )
+        assert (
+            stats['token.username.allowed'], stats['token.username.rejected']
+        ) == (2, 1)
+
+    def test_04_writes_per_user(self, admin_client, user_client, rates):
+        rates(write_user='1/min')
+        assert admin_client.get(self.CATEGORIES_URL).status_code == (
+            HTTPStatus.OK
+        )
+        response = admin_client.post(
+            self.CATEGORIES_URL, data={'name': 'Кино', 'slug': 'movie'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        response = admin_client.post(
+            self.CATEGORIES_URL, data={'name': 'Книги', 'slug': 'books'}
+        )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что изменяющие запросы ограничены для пользователя.'
+        )
+        assert admin_client.get(self.CATEGORIES_URL).status_code == (
+            HTTPStatus.OK
+        ), (
+            'Проверьте, что чтение не ограничивается корзиной для записи.'
+        )
+        response = admin_client.get(self.STATS_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {
+            'write.user.allowed': 1, 'write.user.rejected': 1
+        }
+        assert user_client.get(self.STATS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+
+    def test_05_local_buckets(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr('api.throttling.time.monotonic', lambda: now[0])
+        buckets = LocalBuckets(maxsize=2)
+        assert buckets.take('a', 2, 60) == (True, 0)
+        assert buckets.take('a', 2, 60) == (True, 0)
+        allowed, wait = buckets.take('a', 2, 60)
+        assert (allowed, wait) == (False, 30)
+        now[0] += 30
+        assert buckets.take('a', 2, 60)[0], (
+            'Проверьте, что корзина пополняется со временем.'
+        )
+        now[0] += 60
+        buckets.take('b', 2, 60)
+        buckets.take('c', 2, 60)
+        assert set(buckets.data) == {'b', 'c'}, (
+            'Проверьте, что при переполнении отбрасываются полные корзины.'
+        )
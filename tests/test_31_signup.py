@@ -0,0 +1,72 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test31Signup:
+
+    SIGNUP_URL = '/api/v1/auth/signup/'
+    USERS_URL = '/api/v1/users/'
+
+    def user_writes(self, context):
+        return [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith(('INSERT', 'UPDATE'))
+            and '"reviews_user"' in query['sql']
+        ]
+
+    def test_01_classification(self, client, user, django_user_model):
+        data = {'username': user.username, 'email': user.email.upper()}
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.SIGNUP_URL, data=data)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что зарегистрированный пользователь может повторно '
+            'запросить код, указав почту в другом регистре.'
+        )
+        assert response.json() == {
+            'username': user.username, 'email': user.email
+        }
+        assert not self.user_writes(context), (
+            'Проверьте, что при повторной регистрации пользователь '
+            'не записывается в базу.'
+        )
+        response = client.post(self.SIGNUP_URL, data={
+            'username': user.username.upper(), 'email': 'other@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert set(response.json()) == {'username'}, (
+            'Проверьте, что username занят без учёта регистра.'
+        )
+        response = client.post(self.SIGNUP_URL, data={
+            'username': 'other', 'email': user.email.upper()
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert set(response.json()) == {'email'}
+        assert django_user_model.objects.count() == 1
+
+    def test_02_conflict_queries(self, client, user, admin,
+                                 django_assert_num_queries):
+        with django_assert_num_queries(1):
+            response = client.post(self.SIGNUP_URL, data={
+                'username': user.username, 'email': admin.email
+            })
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что конфликт при регистрации определяется одним '
+            'запросом.'
+        )
+        assert set(response.json()) == {'username', 'email'}
+
+    def test_03_case_insensitive_constraints(self, admin_client, user,
+                                             django_user_model):
+        response = admin_client.post(self.USERS_URL, data={
+            'username': user.username.upper(), 'email': 'other@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'username' in response.json()
+        with pytest.raises(IntegrityError):
+            django_user_model.objects.create(
+                username='other', email=user.email.upper()
+            )
@@ -1,5 +1,9 @@
+import subprocess
+import sys
 from http import HTTPStatus
 
+from django.conf import settings
+
 
 check_name_and_slug_patterns = (
     (
@@ -305,3 +309,12 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def run_in_other_process(code):
+    """Выполняет код в отдельном процессе manage.py, как другой воркер."""
+    subprocess.run(
+        [sys.executable, 'manage.py', 'shell', '-c', code],
+        cwd=settings.BASE_DIR,
+        check=True
+    )